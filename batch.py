@@ -0,0 +1,115 @@
+import argparse
+import contextlib
+import io
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from binary_lines import LINES_METHOD
+from binary_puzzle import solve_puzzle_backtrack, solve_puzzle_forward, solve_puzzle_mac, solve_puzzle_backjump, \
+    solve_puzzle_lines
+from corpus import BINARY_PUZZLE, FUTOSHIKI_PUZZLE, collect_puzzle_files
+from csp import SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, MRV_HEURISTIC, LCV_HEURISTIC, BACKTRACKING_METHOD, \
+    FORWARD_METHOD, MAC_METHOD, BACKJUMPING_METHOD
+from futoshiki_dlx import DLX_METHOD
+from futoshiki_puzzle import solve_futoshiki_backtrack, solve_futoshiki_forward, solve_futoshiki_mac, \
+    solve_futoshiki_backjump, solve_futoshiki_dlx
+
+RESULTS_HEADER = "input;method;heuristic;domain_heuristic;nodes;time\n"
+TIMEOUT_RESULT = "TIMEOUT"
+ERROR_RESULT = "ERROR"
+
+SOLVERS = {
+    (BINARY_PUZZLE, BACKTRACKING_METHOD): solve_puzzle_backtrack,
+    (BINARY_PUZZLE, FORWARD_METHOD): solve_puzzle_forward,
+    (BINARY_PUZZLE, MAC_METHOD): solve_puzzle_mac,
+    (BINARY_PUZZLE, BACKJUMPING_METHOD): solve_puzzle_backjump,
+    (BINARY_PUZZLE, LINES_METHOD): solve_puzzle_lines,
+    (FUTOSHIKI_PUZZLE, BACKTRACKING_METHOD): solve_futoshiki_backtrack,
+    (FUTOSHIKI_PUZZLE, FORWARD_METHOD): solve_futoshiki_forward,
+    (FUTOSHIKI_PUZZLE, MAC_METHOD): solve_futoshiki_mac,
+    (FUTOSHIKI_PUZZLE, BACKJUMPING_METHOD): solve_futoshiki_backjump,
+    (FUTOSHIKI_PUZZLE, DLX_METHOD): solve_futoshiki_dlx,
+}
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def raise_timeout(signum, frame):
+    raise JobTimeout()
+
+
+def solve_job(job: tuple[str, str, str, str, str], timeout: Optional[float]) -> tuple[str, str]:
+    file_name, puzzle_type, method, heuristic, domain_heuristic = job
+    # the timer fires inside the worker, so a job over its limit really stops instead of holding the process
+    use_timer = timeout is not None and hasattr(signal, "setitimer")
+    if use_timer:
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            nodes, took = SOLVERS[(puzzle_type, method)](file_name, False, heuristic, domain_heuristic)
+        return str(nodes), str(took)
+    except JobTimeout:
+        return TIMEOUT_RESULT, TIMEOUT_RESULT
+    except Exception:
+        # a file that does not load (or a solver that fails on it) costs its own row, not the whole sweep
+        return ERROR_RESULT, ERROR_RESULT
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def run_batch(inputs: list[str], output_file: Optional[str] = None, workers: Optional[int] = None,
+              timeout: Optional[float] = None, methods: Optional[list[str]] = None,
+              heuristics: Optional[list[str]] = None, domain_heuristics: Optional[list[str]] = None) -> list[str]:
+    if methods is None:
+        methods = [BACKTRACKING_METHOD, FORWARD_METHOD, MAC_METHOD, BACKJUMPING_METHOD]
+    if heuristics is None:
+        heuristics = [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, MRV_HEURISTIC]
+    if domain_heuristics is None:
+        domain_heuristics = [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, LCV_HEURISTIC]
+
+    jobs = list()
+    for heuristic in heuristics:
+        for domain_heuristic in domain_heuristics:
+            for input_file, puzzle_type in collect_puzzle_files(inputs):
+                for method in methods:
+                    # not every method exists for every puzzle type (line patterns are binary only)
+                    if (puzzle_type, method) not in SOLVERS:
+                        continue
+                    jobs.append((input_file, puzzle_type, method, heuristic, domain_heuristic))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_job, job, timeout) for job in jobs]
+        lines = list()
+        for job, future in zip(jobs, futures):
+            input_file, _, method, heuristic, domain_heuristic = job
+            nodes, took = future.result()
+            lines.append(f"{input_file};{method};{heuristic};{domain_heuristic};{nodes};{took}\n")
+
+    if output_file is not None:
+        with open(output_file, "w", encoding="utf-8") as output:
+            output.write(RESULTS_HEADER)
+            output.writelines(lines)
+    return lines
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Solve puzzle files in parallel and write the results table")
+    parser.add_argument("inputs", nargs="+", help="puzzle files or directories with them (e.g. dane)")
+    parser.add_argument("-o", "--output", help="results file, printed to stdout when missing")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-t", "--timeout", type=float, default=None, help="time limit of one job in seconds")
+    parser.add_argument("--methods", nargs="+", default=None)
+    parser.add_argument("--heuristics", nargs="+", default=None)
+    parser.add_argument("--domain-heuristics", nargs="+", default=None)
+    args = parser.parse_args()
+
+    results = run_batch(args.inputs, args.output, args.workers, args.timeout, args.methods, args.heuristics,
+                        args.domain_heuristics)
+    if args.output is None:
+        print(RESULTS_HEADER, end="")
+        print("".join(results), end="")
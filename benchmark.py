@@ -0,0 +1,246 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import random
+import signal
+import statistics
+import sys
+import time
+from typing import Callable, Optional
+
+from tabulate import tabulate
+
+from batch import JobTimeout, raise_timeout
+from binary_lines import LINES_METHOD, BinaryLineSolver
+from binary_puzzle import BinaryPuzzle
+from corpus import BINARY_PUZZLE, FUTOSHIKI_PUZZLE, collect_puzzle_files, iter_puzzles
+from csp import CSP_Answer, CSP_Statistics, SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, MRV_HEURISTIC, LCV_HEURISTIC, \
+    BACKTRACKING_METHOD, FORWARD_METHOD, MAC_METHOD, BACKJUMPING_METHOD
+from futoshiki_dlx import DLX_METHOD, FutoshikiDLX
+from futoshiki_puzzle import Futoshiki
+from generator import generate_puzzle
+
+BENCHMARK_VERSION = 1
+# modes outside CSP_Solver: solver class and the puzzle type it works on
+SEPARATE_SOLVERS = {
+    LINES_METHOD: (BinaryLineSolver, BinaryPuzzle),
+    DLX_METHOD: (FutoshikiDLX, Futoshiki),
+}
+TIMEOUT_STATUS = "TIMEOUT"
+SOLVED_STATUS = "SOLVED"
+UNSOLVED_STATUS = "UNSOLVED"
+
+# (type, size) of the generated instances, larger than anything in dane/
+GENERATED_INSTANCES = [(BINARY_PUZZLE, 12), (BINARY_PUZZLE, 14), (FUTOSHIKI_PUZZLE, 7)]
+GENERATED_DENSITY = 0.35
+
+
+def collect_instances(inputs: list[str], generated: list[tuple[str, int]], density: float,
+                      seed: int) -> list[tuple[str, object]]:
+    # generated instances have a unique solution, with at least density of their cells as clues
+    instances = list()
+    for file_name, _ in collect_puzzle_files(inputs):
+        for index, puzzle in enumerate(iter_puzzles(file_name)):
+            instances.append((file_name if index == 0 else f"{file_name}#{index}", puzzle))
+    for puzzle_type, size in generated:
+        instances.append((f"generated/{puzzle_type}_{size}x{size}_s{seed}",
+                          generate_puzzle(puzzle_type, size, seed, density)))
+    return instances
+
+
+def start_solution_of(puzzle) -> list[CSP_Answer]:
+    return puzzle.loaded_data if isinstance(puzzle, BinaryPuzzle) else puzzle.loaded_numbers
+
+
+def timed_run(puzzle, method: str, heuristic: str, domain_heuristic: str, seed: int,
+              timeout: Optional[float]) -> Optional[CSP_Statistics]:
+    # one search for the first solution, None when it did not finish in time
+    use_timer = timeout is not None and hasattr(signal, "setitimer")
+    if use_timer:
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    random.seed(seed)
+    if method in SEPARATE_SOLVERS:
+        # not a CSP_Solver mode, its run is measured by the solver's statistics hook all the same
+        number_of_enters = {"number": 0}
+        puzzle.solver.statistics = CSP_Statistics(method, heuristic, domain_heuristic)
+        solver = SEPARATE_SOLVERS[method][0](puzzle)
+        run = puzzle.solver.profiled_run(solver.iter_solutions(1, heuristic, domain_heuristic, number_of_enters),
+                                         puzzle.solver.statistics, number_of_enters)
+    else:
+        run = puzzle.solver.iter_solutions(start_solution_of(puzzle), 1, method, heuristic, domain_heuristic)
+    try:
+        for _ in run:
+            pass
+    except JobTimeout:
+        return None
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return puzzle.solver.statistics
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    # nearest rank
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def benchmark_case(puzzle, method: str, heuristic: str, domain_heuristic: str, warmup: int, repeats: int,
+                   seed: int, timeout: Optional[float], measure_memory: bool) -> dict:
+    solver = puzzle.solver
+    solver.enable_statistics()
+    try:
+        for i in range(warmup):
+            if timed_run(puzzle, method, heuristic, domain_heuristic, seed + i, timeout) is None:
+                return {"status": TIMEOUT_STATUS}
+        runs = list()
+        # random heuristics are seeded per repeat, so every benchmark run sees the same searches
+        for i in range(repeats):
+            run = timed_run(puzzle, method, heuristic, domain_heuristic, seed + i, timeout)
+            if run is None:
+                return {"status": TIMEOUT_STATUS}
+            runs.append(run)
+        peak_memory = None
+        if measure_memory:
+            # separate run, tracemalloc would distort the timed ones
+            solver.enable_statistics(trace_memory=True)
+            run = timed_run(puzzle, method, heuristic, domain_heuristic, seed, timeout)
+            peak_memory = run.peak_memory if run is not None else None
+    finally:
+        solver.disable_statistics()
+
+    times = [r.total_time for r in runs]
+    nodes = [r.nodes for r in runs]
+    return {
+        "status": SOLVED_STATUS if all(r.solutions > 0 for r in runs) else UNSOLVED_STATUS,
+        "repeats": repeats,
+        "median_time": statistics.median(times),
+        "p95_time": percentile(times, 0.95),
+        "min_time": min(times),
+        "median_nodes": statistics.median(nodes),
+        "nodes_per_second": sum(nodes) / sum(times) if sum(times) > 0 else None,
+        "check_time_share": sum(r.check_time for r in runs) / sum(times) if sum(times) > 0 else None,
+        "peak_memory": peak_memory,
+    }
+
+
+def run_benchmark(inputs: list[str], generated: list[tuple[str, int]], methods: list[str], heuristics: list[str],
+                  domain_heuristics: list[str], warmup: int = 1, repeats: int = 5, seed: int = 0,
+                  timeout: Optional[float] = None, density: float = GENERATED_DENSITY, measure_memory: bool = True,
+                  progress: Optional[Callable[[dict], None]] = None) -> dict:
+    results = list()
+    for instance, puzzle in collect_instances(inputs, generated, density, seed):
+        for method in methods:
+            if method in SEPARATE_SOLVERS and not isinstance(puzzle, SEPARATE_SOLVERS[method][1]):
+                continue
+            for heuristic in heuristics:
+                for domain_heuristic in domain_heuristics:
+                    result = {"instance": instance, "method": method, "heuristic": heuristic,
+                              "domain_heuristic": domain_heuristic}
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        result.update(benchmark_case(puzzle, method, heuristic, domain_heuristic, warmup, repeats,
+                                                     seed, timeout, measure_memory))
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+    return {
+        "version": BENCHMARK_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {"warmup": warmup, "repeats": repeats, "seed": seed, "timeout": timeout, "density": density},
+        "results": results,
+    }
+
+
+def case_key(result: dict) -> tuple:
+    return result["instance"], result["method"], result["heuristic"], result["domain_heuristic"]
+
+
+def compare_results(current: dict, baseline: dict, threshold: float = 0.1) -> list[dict]:
+    # a case regresses when it stops finishing, needs more nodes, or its median time grows by more than threshold
+    baseline_results = {case_key(r): r for r in baseline["results"]}
+    comparison = list()
+    for result in current["results"]:
+        old = baseline_results.get(case_key(result))
+        if old is None:
+            continue
+        entry = {"instance": result["instance"], "method": result["method"], "heuristic": result["heuristic"],
+                 "domain_heuristic": result["domain_heuristic"], "flags": list()}
+        if result["status"] != SOLVED_STATUS or old["status"] != SOLVED_STATUS:
+            entry["speedup"] = None
+            if result["status"] != old["status"] and result["status"] != SOLVED_STATUS:
+                entry["flags"].append(f"{old['status']} -> {result['status']}")
+        else:
+            entry["speedup"] = old["median_time"] / result["median_time"] if result["median_time"] > 0 else None
+            if result["median_time"] > old["median_time"] * (1 + threshold):
+                entry["flags"].append("slower")
+            if result["median_nodes"] > old["median_nodes"]:
+                entry["flags"].append("more nodes")
+        comparison.append(entry)
+    return comparison
+
+
+def results_table(results: list[dict]) -> str:
+    rows = list()
+    for r in results:
+        if r["status"] == TIMEOUT_STATUS:
+            rows.append([r["instance"], r["method"], r["heuristic"], r["domain_heuristic"], r["status"]])
+            continue
+        rows.append([r["instance"], r["method"], r["heuristic"], r["domain_heuristic"], r["status"],
+                     r["median_nodes"], f"{r['median_time']:.5f}", f"{r['p95_time']:.5f}",
+                     None if r["nodes_per_second"] is None else int(r["nodes_per_second"]), r["peak_memory"]])
+    return tabulate(rows, ["instance", "method", "heuristic", "domain", "status", "nodes", "median s", "p95 s",
+                           "nodes/s", "peak bytes"])
+
+
+def comparison_table(comparison: list[dict]) -> str:
+    return tabulate([[c["instance"], c["method"], c["heuristic"], c["domain_heuristic"],
+                      None if c["speedup"] is None else f"{c['speedup']:.2f}x", ", ".join(c["flags"])]
+                     for c in comparison], ["instance", "method", "heuristic", "domain", "speedup", "regression"])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark every solver mode and heuristic, optionally against "
+                                                 "a stored baseline")
+    parser.add_argument("inputs", nargs="*", default=["dane"], help="puzzle files, corpora or directories")
+    parser.add_argument("-o", "--output", help="write the results as JSON (usable as a later --baseline)")
+    parser.add_argument("-b", "--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed median time growth (0.1 = 10%%)")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0, help="seed of generated instances and random heuristics")
+    parser.add_argument("-t", "--timeout", type=float, default=30, help="time limit of one run in seconds")
+    parser.add_argument("--no-generated", action="store_true", help="only benchmark the given inputs")
+    parser.add_argument("--density", type=float, default=GENERATED_DENSITY,
+                        help="clues left at least in generated ones, as a share of the cells")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run of every case")
+    parser.add_argument("--methods", nargs="+", default=[BACKTRACKING_METHOD, FORWARD_METHOD, MAC_METHOD,
+                                                             BACKJUMPING_METHOD, LINES_METHOD, DLX_METHOD])
+    parser.add_argument("--heuristics", nargs="+", default=[SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, MRV_HEURISTIC])
+    parser.add_argument("--domain-heuristics", nargs="+",
+                        default=[SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, LCV_HEURISTIC])
+    args = parser.parse_args()
+
+    report = run_benchmark(args.inputs, [] if args.no_generated else GENERATED_INSTANCES, args.methods,
+                           args.heuristics, args.domain_heuristics, args.warmup, args.repeats, args.seed, args.timeout,
+                           args.density, not args.no_memory,
+                           lambda r: print(f"{r['instance']};{r['method']};{r['heuristic']};{r['domain_heuristic']}: "
+                                           f"{r['status']}", file=sys.stderr))
+    print(results_table(report["results"]))
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=1)
+    if args.baseline is not None:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            comparison = compare_results(report, json.load(baseline_file), args.threshold)
+        print()
+        print(comparison_table(comparison))
+        regressions = [c for c in comparison if c["flags"]]
+        print(f"{len(regressions)} regressions in {len(comparison)} compared cases")
+        if regressions:
+            exit(1)
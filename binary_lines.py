@@ -0,0 +1,185 @@
+import functools
+import random
+import time
+from typing import Iterable, Iterator, Optional
+
+from csp import CSP_Answer, SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, MRV_HEURISTIC
+from utils import bit_indices
+
+LINES_METHOD = "lines"  # row and column variables over valid line patterns, binary puzzles only
+
+
+@functools.lru_cache(maxsize=None)
+def line_pattern_table(size: int) -> tuple[tuple[int, ...], tuple[tuple[int, int], ...]]:
+    # every valid line of the given size (balanced, no three equal cells in a row), bit i = cell i holds 1,
+    # and for every cell the sets of patterns holding 0 / 1 there, as bitsets over pattern indices.
+    # Built once per size and shared by every puzzle of that size.
+    patterns = list()
+    stack = [(0, 0, 0, 0, -1, 0)]  # cell, bits, ones, zeros, last value, length of its run
+    while len(stack) > 0:
+        cell, bits, ones, zeros, last, run = stack.pop()
+        if cell == size:
+            patterns.append(bits)
+            continue
+        for value in [1, 0]:
+            if (ones if value == 1 else zeros) >= size // 2:
+                continue
+            value_run = run + 1 if value == last else 1
+            if value_run > 2:
+                continue
+            stack.append((cell + 1, bits | (value << cell), ones + value, zeros + 1 - value, value, value_run))
+    patterns.sort()
+    cell_masks = [[0, 0] for _ in range(size)]
+    for index, pattern in enumerate(patterns):
+        for cell in range(size):
+            cell_masks[cell][pattern >> cell & 1] |= 1 << index
+    return tuple(patterns), tuple((zeros, ones) for zeros, ones in cell_masks)
+
+
+def pattern_count(domain: int) -> int:
+    return bin(domain).count("1")
+
+
+class BinaryLineSolver:
+    # Solves a BinaryPuzzle with one variable per row and per column instead of one per cell. A domain is a bitset
+    # over the valid patterns of its line, clues and crossing lines are applied by ANDing cell masks.
+    def __init__(self, puzzle):
+        self.puzzle = puzzle
+        self.row_patterns, self.row_cell_masks = line_pattern_table(puzzle.size_x)
+        self.column_patterns, self.column_cell_masks = line_pattern_table(puzzle.size_y)
+
+    def start_domains(self, clues: Optional[list[CSP_Answer]] = None,
+                      excluded: Iterable[CSP_Answer] = ()) -> Optional[tuple[list[int], list[int]]]:
+        # clues, when given, stand in for the puzzle's own (a generator taking them away one by one);
+        # no solution holds an excluded answer
+        if clues is None:
+            clues = self.puzzle.loaded_data
+        rows = [(1 << len(self.row_patterns)) - 1 for _ in range(self.puzzle.size_y)]
+        columns = [(1 << len(self.column_patterns)) - 1 for _ in range(self.puzzle.size_x)]
+        queue = list()
+        for answer in clues:
+            x, y = answer.variable_position
+            rows[y] &= self.row_cell_masks[x][answer.answer_domain]
+            columns[x] &= self.column_cell_masks[y][answer.answer_domain]
+        for answer in excluded:
+            x, y = answer.variable_position
+            rows[y] &= self.row_cell_masks[x][1 - answer.answer_domain]
+            columns[x] &= self.column_cell_masks[y][1 - answer.answer_domain]
+        queue.extend((True, y) for y in range(len(rows)))
+        queue.extend((False, x) for x in range(len(columns)))
+        if not self.propagate(rows, columns, queue):
+            return None
+        return rows, columns
+
+    def propagate(self, rows: list[int], columns: list[int], queue: list[tuple[bool, int]]) -> bool:
+        # cells every pattern left in a line agrees on are forced into the crossing lines, a line down to one
+        # pattern takes it away from the other lines of its kind (unique rows / columns), until nothing changes
+        while len(queue) > 0:
+            is_row, index = queue.pop()
+            if is_row:
+                lines, own_masks, crossing, crossing_masks = rows, self.row_cell_masks, columns, self.column_cell_masks
+            else:
+                lines, own_masks, crossing, crossing_masks = columns, self.column_cell_masks, rows, self.row_cell_masks
+            domain = lines[index]
+            if domain == 0:
+                return False
+            for cell, (zeros, ones) in enumerate(own_masks):
+                if domain & zeros == 0:
+                    value = 1
+                elif domain & ones == 0:
+                    value = 0
+                else:
+                    continue
+                narrowed = crossing[cell] & crossing_masks[index][value]
+                if narrowed != crossing[cell]:
+                    if narrowed == 0:
+                        return False
+                    crossing[cell] = narrowed
+                    queue.append((not is_row, cell))
+            if domain & (domain - 1) == 0:
+                for other in range(len(lines)):
+                    if other != index and lines[other] & domain:
+                        lines[other] &= ~domain
+                        if lines[other] == 0:
+                            return False
+                        queue.append((is_row, other))
+        return True
+
+    def next_line(self, rows: list[int], columns: list[int], heuristic: str) -> Optional[tuple[bool, int]]:
+        open_lines = [(True, y) for y, d in enumerate(rows) if d & (d - 1)] + \
+                     [(False, x) for x, d in enumerate(columns) if d & (d - 1)]
+        if len(open_lines) == 0:
+            return None
+        if heuristic == MRV_HEURISTIC:
+            return min(open_lines, key=lambda line: pattern_count(rows[line[1]] if line[0] else columns[line[1]]))
+        if heuristic == RANDOM_HEURISTIC:
+            return random.choice(open_lines)
+        return open_lines[0]
+
+    def line_recurrence(self, rows: list[int], columns: list[int], number_of_enters: dict, heuristic: str,
+                        domain_heuristic: str) -> Iterator[list[int]]:
+        number_of_enters["number"] += 1
+        line = self.next_line(rows, columns, heuristic)
+        if line is None:
+            yield rows
+            return
+        is_row, index = line
+        choices = bit_indices(rows[index] if is_row else columns[index])
+        if domain_heuristic == RANDOM_HEURISTIC:
+            random.shuffle(choices)
+        for choice in choices:
+            next_rows, next_columns = list(rows), list(columns)
+            (next_rows if is_row else next_columns)[index] = 1 << choice
+            if self.propagate(next_rows, next_columns, [line]):
+                yield from self.line_recurrence(next_rows, next_columns, number_of_enters, heuristic,
+                                                domain_heuristic)
+
+    def iter_solutions(self, limit: Optional[int] = None, heuristic: str = MRV_HEURISTIC,
+                       domain_heuristic: str = SEQUENTIAL_HEURISTIC,
+                       number_of_enters: Optional[dict] = None) -> Iterator[list[CSP_Answer]]:
+        if number_of_enters is None:
+            number_of_enters = {"number": 0}
+        if limit is not None and limit <= 0:
+            return
+        domains = self.start_domains()
+        if domains is None:
+            return
+        found = 0
+        for rows in self.line_recurrence(domains[0], domains[1], number_of_enters, heuristic, domain_heuristic):
+            yield self.to_answers(rows)
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+    def count_solutions(self, limit: Optional[int] = None, heuristic: str = MRV_HEURISTIC,
+                        domain_heuristic: str = SEQUENTIAL_HEURISTIC, clues: Optional[list[CSP_Answer]] = None,
+                        excluded: Iterable[CSP_Answer] = ()) -> int:
+        # without turning the solutions into answers
+        if limit is not None and limit <= 0:
+            return 0
+        domains = self.start_domains(clues, excluded)
+        if domains is None:
+            return 0
+        found = 0
+        for _ in self.line_recurrence(domains[0], domains[1], {"number": 0}, heuristic, domain_heuristic):
+            found += 1
+            if limit is not None and found >= limit:
+                break
+        return found
+
+    def to_answers(self, rows: list[int]) -> list[CSP_Answer]:
+        answers = list()
+        for y, domain in enumerate(rows):
+            pattern = self.row_patterns[domain.bit_length() - 1]
+            answers.extend(CSP_Answer((x, y), pattern >> x & 1) for x in range(self.puzzle.size_x))
+        return answers
+
+    def try_solve(self, heuristic: str = MRV_HEURISTIC, domain_heuristic: str = SEQUENTIAL_HEURISTIC):
+        number_of_enters = {"number": 0}
+        timer = time.time()
+        total_solutions = list(self.iter_solutions(1, heuristic, domain_heuristic, number_of_enters))
+        end = time.time()
+        if len(total_solutions) > 0:
+            print("Found one solution!")
+        print(f"Line patterns: Total nodes entered: {number_of_enters['number']}. Took {end - timer}")
+        return total_solutions, (number_of_enters['number'], end - timer)
@@ -1,145 +1,259 @@
-from typing import Any
+from typing import Any, Iterable, Optional
 
 import numpy as np
 from tabulate import tabulate
 
-from csp import CSP_Solver, SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC
+from csp import CSP_Assignment, CSP_Solver, EMPTY_CELL, SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, MRV_HEURISTIC, \
+    LCV_HEURISTIC, FORWARD_METHOD, default_portfolio
+from binary_lines import BinaryLineSolver
 from utils import *
 
 
-def check_unique_columns_rows(answers: list, answer: CSP_Answer, puzzle):
-    puzzle: BinaryPuzzle
-    table = puzzle.binary_puzzle_get_array(answers + [answer], "x")
-
-    zeros = 0
-    ones = 0
-    for y in range(puzzle.size_y):
-        if table[y][answer.variable_position[0]] == "x":
-            zeros = -1
-            break
-        elif table[y][answer.variable_position[0]] == 0:
-            zeros += 1
-        elif table[y][answer.variable_position[0]] == 1:
-            ones += 1
-        else:
-            assert False
+class BinaryLineState:
+    # bitboards for one row or column, kept up to date by line_assign/line_unassign
+    # plain python ints, so a line can be as wide as needed (14x14, 20x20, ...)
+    def __init__(self, size: int):
+        self.size = size
+        self.counts = [0, 0]  # zeros, ones
+        self.empty = size
+        self.filled = 0  # bit i is set when cell i holds any value
+        self.bits = 0  # bit i is set when cell i holds 1
 
-    if zeros != -1 and zeros != ones:
-        return False
 
-    zeros = 0
-    ones = 0
-    for x in range(puzzle.size_x):
-        if table[answer.variable_position[1]][x] == "x":
-            zeros = -1
-            break
-        elif table[answer.variable_position[1]][x] == 0:
-            zeros += 1
-        elif table[answer.variable_position[1]][x] == 1:
-            ones += 1
-        else:
-            assert False
+def line_cells(line: BinaryLineState, value: int) -> int:
+    return line.bits if value == 1 else line.filled & ~line.bits
 
-    if zeros != -1 and zeros != ones:
+
+def check_line(line: BinaryLineState, completed: dict, index: int, value: int) -> bool:
+    if line.counts[value] + 1 > line.size // 2:
+        return False
+    # three equal cells in a row, only the windows that hold index are looked at
+    same = line_cells(line, value) | (1 << index)
+    if same & (same >> 1) & (same >> 2) & ((7 << index) >> 2):
         return False
+    if line.empty == 1:
+        # answer completes the line
+        if line.counts[value] + 1 != line.counts[1 - value]:
+            return False
+        if line.bits | (value << index) in completed:
+            return False
+    return True
 
-    uniques = list()
-
-    for row in table:
-        if "x" not in row:
-            n = (np.packbits(row))[0]
-            if n in uniques:
-                return False
-            uniques.append(n)
-
-    # u = "".join(list(map(lambda d: str(d), row)))
-    #
-    #     if "x" not in u:
-    #         if u in uniques:
-    #             return False
-    #         uniques.append(u)
-
-    uniques.clear()
-    np.transpose(table)
-    for row in table:
-        if "x" not in row:
-            n = (np.packbits(row))[0]
-            if n in uniques:
-                return False
-            uniques.append(n)
-
-    # for column in range(len(table[0])):
-    #     u = ""
-    #     for row in range(len(table)):
-    #         u += str(table[row][column])
-    #
-    #     if "x" not in u:
-    #         if u in uniques:
-    #             return False
-    #         uniques.append(u)
+
+def check_unique_columns_rows(answers: CSP_Assignment, answer: CSP_Answer, puzzle):
+    puzzle: BinaryPuzzle
+    x_pos, y_pos = answer.variable_position
+    if not check_line(puzzle.rows[y_pos], puzzle.completed_rows, x_pos, answer.answer_domain):
+        return False
+    if not check_line(puzzle.columns[x_pos], puzzle.completed_columns, y_pos, answer.answer_domain):
+        return False
     return True
 
 
-def binary_puzzle_tester(answer: CSP_Answer, solver: CSP_Solver, answers: list[CSP_Answer], puzzle) -> bool:
-    assert answer != null_answer
-    assert answer.answer_domain in [0, 1]  # FIRST CASE
+def line_conflicts(lines: list[BinaryLineState], line_number: int, index: int, value: int) -> Optional[list[tuple]]:
+    # why check_line rejects value at index - (line number, cell index) of the cells responsible, None if it does not
+    line = lines[line_number]
+    same = line_cells(line, value)
+    if line.counts[value] + 1 > line.size // 2:
+        return [(line_number, i) for i in bit_indices(same)]
+    with_value = same | (1 << index)
+    triples = with_value & (with_value >> 1) & (with_value >> 2) & ((7 << index) >> 2)
+    if triples:
+        start = bit_indices(triples)[0]
+        return [(line_number, i) for i in range(start, start + 3) if i != index]
+    if line.empty == 1:
+        cells = [(line_number, i) for i in bit_indices(line.filled)]
+        if line.counts[value] + 1 != line.counts[1 - value]:
+            return cells
+        bits = line.bits | (value << index)
+        for other_number, other in enumerate(lines):
+            if other_number != line_number and other.empty == 0 and other.bits == bits:
+                return cells + [(other_number, i) for i in range(other.size)]
+    return None
+
+
+def line_assign(line: BinaryLineState, completed: dict, index: int, value: int) -> bool:
+    # True when the line completes into a pattern another full line already has,
+    # check_line keeps the search from doing that, so only clue lines can
+    line.counts[value] += 1
+    line.empty -= 1
+    line.filled |= 1 << index
+    line.bits |= value << index
+    if line.empty == 0:
+        completed[line.bits] = completed.get(line.bits, 0) + 1
+        return completed[line.bits] > 1
+    return False
+
+
+def line_unassign(line: BinaryLineState, completed: dict, index: int, value: int) -> bool:
+    repeated = False
+    if line.empty == 0:
+        repeated = completed[line.bits] > 1
+        if repeated:
+            completed[line.bits] -= 1
+        else:
+            del completed[line.bits]
+    line.counts[value] -= 1
+    line.empty += 1
+    line.filled &= ~(1 << index)
+    line.bits &= ~(1 << index)
+    return repeated
+
+
+def binary_puzzle_reset(solver: CSP_Solver, puzzle):
+    puzzle: BinaryPuzzle
+    puzzle.rows = [BinaryLineState(puzzle.size_x) for _ in range(puzzle.size_y)]
+    puzzle.columns = [BinaryLineState(puzzle.size_y) for _ in range(puzzle.size_x)]
+    puzzle.completed_rows = dict()
+    puzzle.completed_columns = dict()
+    puzzle.repeated_lines = 0
+
+
+def binary_puzzle_assign(answer: CSP_Answer, solver: CSP_Solver, puzzle):
     puzzle: BinaryPuzzle
     x_pos, y_pos = answer.variable_position
+    puzzle.repeated_lines += line_assign(puzzle.rows[y_pos], puzzle.completed_rows, x_pos, answer.answer_domain)
+    puzzle.repeated_lines += line_assign(puzzle.columns[x_pos], puzzle.completed_columns, y_pos,
+                                         answer.answer_domain)
 
-    # SECOND CASE
-    if x_pos > 0 and get_answer_in_pos(x_pos - 1, y_pos, answers).answer_domain == answer.answer_domain:
-        if x_pos - 1 > 0 and get_answer_in_pos(x_pos - 2, y_pos, answers).answer_domain == answer.answer_domain:
-            return False
-    if x_pos < puzzle.size_x and get_answer_in_pos(x_pos + 1, y_pos, answers).answer_domain == answer.answer_domain:
-        if x_pos + 1 < puzzle.size_x and get_answer_in_pos(x_pos + 2, y_pos,
-                                                           answers).answer_domain == answer.answer_domain:
-            return False
 
-    if y_pos > 0 and get_answer_in_pos(x_pos, y_pos - 1, answers).answer_domain == answer.answer_domain:
-        if y_pos - 1 > 0 and get_answer_in_pos(x_pos, y_pos - 2, answers).answer_domain == answer.answer_domain:
-            return False
-    if y_pos < puzzle.size_y and get_answer_in_pos(x_pos, y_pos + 1, answers).answer_domain == answer.answer_domain:
-        if y_pos + 1 < puzzle.size_y and get_answer_in_pos(x_pos, y_pos + 2,
-                                                           answers).answer_domain == answer.answer_domain:
+def binary_puzzle_unassign(answer: CSP_Answer, solver: CSP_Solver, puzzle):
+    puzzle: BinaryPuzzle
+    x_pos, y_pos = answer.variable_position
+    puzzle.repeated_lines -= line_unassign(puzzle.rows[y_pos], puzzle.completed_rows, x_pos, answer.answer_domain)
+    puzzle.repeated_lines -= line_unassign(puzzle.columns[x_pos], puzzle.completed_columns, y_pos,
+                                           answer.answer_domain)
+
+
+def binary_puzzle_conflicts(answer: CSP_Answer, solver: CSP_Solver, puzzle):
+    # cells that make binary_puzzle_tester reject answer, a rejected row is enough, the column is only checked after it
+    puzzle: BinaryPuzzle
+    if puzzle.repeated_lines:
+        # the clues themselves are inconsistent, no assigned cell is to blame
+        return list()
+    x_pos, y_pos = answer.variable_position
+    row = line_conflicts(puzzle.rows, y_pos, x_pos, answer.answer_domain)
+    if row is not None:
+        return [(x, y) for y, x in row]
+    column = line_conflicts(puzzle.columns, x_pos, y_pos, answer.answer_domain)
+    assert column is not None
+    return column
+
+
+def binary_puzzle_neighbours(variable, solver: CSP_Solver, puzzle):
+    return puzzle.neighbours[variable]
+
+
+def binary_puzzle_arcs(variable, solver: CSP_Solver, puzzle):
+    return puzzle.arcs[variable]
+
+
+def binary_puzzle_arc_test(xi, vi, xj, vj, solver: CSP_Solver, puzzle) -> bool:
+    # two cells of one triple can not share a value with the assigned third cell
+    if vi != vj:
+        return True
+    for third in puzzle.arc_thirds[(xi, xj)]:
+        answer = solver.assignment.get_answer(third)
+        if answer is not None and answer.answer_domain == vi:
             return False
+    return True
+
+
+def binary_puzzle_tester(answer: CSP_Answer, solver: CSP_Solver, answers: CSP_Assignment, puzzle) -> bool:
+    assert answer != null_answer
+    assert answer.answer_domain in [0, 1]  # FIRST CASE
+    puzzle: BinaryPuzzle
+    if puzzle.repeated_lines:
+        # two full clue lines are equal, nothing can be placed
+        return False
 
-    # THIRD CASE FOURTH CASE
+    # SECOND CASE THIRD CASE FOURTH CASE
+    # triples, balance and unique lines are all answered by the row and column bitboards
     if not check_unique_columns_rows(answers, answer, puzzle):
         return False
 
-    # FOURTH CASE
+    return True
+
 
+def check_binary_board(board: np.ndarray) -> bool:
+    # whole board check, every line is handled at once through the row views and the transposed (column) views
+    if (board == EMPTY_CELL).any():
+        return False
+    for lines in [board, board.T]:
+        if (lines.sum(axis=1) * 2 != lines.shape[1]).any():
+            return False
+        if ((lines[:, :-2] == lines[:, 1:-1]) & (lines[:, 1:-1] == lines[:, 2:])).any():
+            return False
+        if len(np.unique(np.packbits(lines.astype(np.uint8), axis=1), axis=0)) != lines.shape[0]:
+            return False
     return True
 
 
 class BinaryPuzzle:
     loaded_data: list[CSP_Answer]
+    rows: list[BinaryLineState]
+    columns: list[BinaryLineState]
+    completed_rows: dict[int, int]  # bit pattern of a full row -> how many rows have it
+    completed_columns: dict[int, int]
+    repeated_lines: int  # full lines whose pattern another full line has as well
+    neighbours: dict[tuple, list[tuple]]  # unsolved cell -> unsolved cells of its row and column (not all)
+    arcs: dict[tuple, list[tuple]]  # unsolved cell -> unsolved cells at most two steps away in its row or column
+    arc_thirds: dict[tuple[tuple, tuple], list[tuple]]  # arc -> cells completing a triple with both its ends
 
     def generate_unsolved_positions(self):
-        l = list()
-        arra = self.binary_puzzle_get_array()
-        for y in range(len(arra)):
-            for x in range(len(arra[y])):
-                if arra[y][x] == ".":
-                    l.append((x, y))
-
-        return l
+        return [(int(x), int(y)) for y, x in np.argwhere(self.binary_puzzle_get_board() == EMPTY_CELL)]
 
     def __init__(self, size_x, size_y, loaded_data):
         self.loaded_data = loaded_data
         self.size_x = size_x
         self.size_y = size_y
-        self.solver = CSP_Solver([0, 1], binary_puzzle_tester, self, self.generate_unsolved_positions())
-
-    def binary_puzzle_get_array(self, answers: list[CSP_Answer] = None, nothing_symbol: Any = "."):
+        unsolved = self.generate_unsolved_positions()
+        # only the cells of the same row or column, a subset of the constraint graph: unique lines ties every
+        # row to every other row (and columns alike). Still correct since the tester re-checks uniqueness, but
+        # forward checking and the MRV degree do not prune on it, and nothing else (MAC arcs, backjumping
+        # conflict sets) may take these neighbours as complete
+        self.neighbours = generate_line_neighbours(unsolved)
+        self.arcs, self.arc_thirds = self.generate_arcs(unsolved)
+        self.solver = CSP_Solver([0, 1], binary_puzzle_tester, self, unsolved, binary_puzzle_reset,
+                                 binary_puzzle_assign, binary_puzzle_unassign, neighbours=binary_puzzle_neighbours,
+                                 arcs=binary_puzzle_arcs, arc_test=binary_puzzle_arc_test,
+                                 conflicts=binary_puzzle_conflicts)
+
+    def generate_arcs(self, unsolved: list[tuple]):
+        unsolved_set = set(unsolved)
+        arcs = {p: list() for p in unsolved}
+        thirds = dict()
+        for p in unsolved:
+            for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+                for distance in [1, 2]:
+                    q = (p[0] + dx * distance, p[1] + dy * distance)
+                    if q not in unsolved_set:
+                        continue
+                    arcs[p].append(q)
+                    if distance == 1:
+                        candidates = [(p[0] - dx, p[1] - dy), (q[0] + dx, q[1] + dy)]
+                    else:
+                        candidates = [(p[0] + dx, p[1] + dy)]
+                    thirds[(p, q)] = [c for c in candidates if 0 <= c[0] < self.size_x and 0 <= c[1] < self.size_y]
+        return arcs, thirds
+
+    def binary_puzzle_get_board(self, answers: Iterable[CSP_Answer] = None) -> np.ndarray:
         if answers is None:
             answers = self.loaded_data
-        l = list()
-        for i in range(self.size_y):
-            l.append([nothing_symbol] * self.size_x)
+        board = np.full((self.size_y, self.size_x), EMPTY_CELL, dtype=np.int8)
         for e in answers:
-            l[e.variable_position[1]][e.variable_position[0]] = e.answer_domain
-        return l
+            board[e.variable_position[1], e.variable_position[0]] = e.answer_domain
+        return board
+
+    def binary_puzzle_get_array(self, answers: Iterable[CSP_Answer] = None, nothing_symbol: Any = "."):
+        # display only, the search works on the answers and the line bitboards, not on a board
+        return [[nothing_symbol if v == EMPTY_CELL else v for v in row]
+                for row in self.binary_puzzle_get_board(answers).tolist()]
+
+    def is_solution(self, answers: Iterable[CSP_Answer]) -> bool:
+        board = self.binary_puzzle_get_board(answers)
+        clues = self.binary_puzzle_get_board()
+        return check_binary_board(board) and bool((board[clues != EMPTY_CELL] == clues[clues != EMPTY_CELL]).all())
 
     def try_solve_backtracking(self, heuristic, domain_hauristic):
         return self.solver.try_backtrack(self.loaded_data, heuristic, domain_hauristic)
@@ -150,30 +264,70 @@ class BinaryPuzzle:
     def try_solve_forward(self, heuristic, domain_hauristic):
         return self.solver.try_forward(self.loaded_data, heuristic, domain_hauristic)
 
+    def try_solve_mac(self, heuristic, domain_hauristic):
+        return self.solver.try_mac(self.loaded_data, heuristic, domain_hauristic)
+
+    def try_solve_backjumping(self, heuristic, domain_hauristic):
+        return self.solver.try_backjump(self.loaded_data, heuristic, domain_hauristic)
+
+    def try_solve_lines(self, heuristic, domain_hauristic):
+        return BinaryLineSolver(self).try_solve(heuristic, domain_hauristic)
+
+    def iter_solutions(self, limit=None, method=FORWARD_METHOD, heuristic=SEQUENTIAL_HEURISTIC,
+                       domain_heuristic=SEQUENTIAL_HEURISTIC):
+        return self.solver.iter_solutions(self.loaded_data, limit, method, heuristic, domain_heuristic)
+
+    def count_solutions(self, limit=None, method=FORWARD_METHOD, heuristic=SEQUENTIAL_HEURISTIC,
+                        domain_heuristic=SEQUENTIAL_HEURISTIC):
+        return self.solver.count_solutions(self.loaded_data, limit, method, heuristic, domain_heuristic)
+
+    def solve(self, limit=1, method=FORWARD_METHOD, heuristic=SEQUENTIAL_HEURISTIC,
+              domain_heuristic=SEQUENTIAL_HEURISTIC, budget=None):
+        return self.solver.solve(self.loaded_data, method, heuristic, domain_heuristic, limit, budget)
+
+    def try_solve_portfolio(self, configurations=None, workers=None):
+        if configurations is None:
+            configurations = default_portfolio()
+        return self.solver.try_portfolio(self.loaded_data, configurations, workers)
+
+
+# byte -> cell value, everything that is not 0/1 is an empty cell
+BINARY_CELLS = np.full(256, EMPTY_CELL, dtype=np.int8)
+BINARY_CELLS[ord("0")] = 0
+BINARY_CELLS[ord("1")] = 1
+# cell value + 1 -> byte, the other way round
+BINARY_SYMBOLS = np.frombuffer(b"x01", dtype=np.uint8)
+
+
+def parse_binary_board(lines: list[bytes]) -> np.ndarray:
+    # lines of one puzzle in the text format, without line endings
+    return BINARY_CELLS[np.frombuffer(b"".join(lines), dtype=np.uint8)].reshape(len(lines), len(lines[0]))
+
+
+def format_binary_board(board: np.ndarray) -> list[bytes]:
+    # the text format lines of a board, parse_binary_board reads them back
+    return [row.tobytes() for row in BINARY_SYMBOLS[board.astype(np.intp) + 1]]
+
+
+def binary_puzzle_from_board(board: np.ndarray) -> BinaryPuzzle:
+    loaded_data = [CSP_Answer((int(x), int(y)), int(board[y, x])) for y, x in np.argwhere(board != EMPTY_CELL)]
+    return BinaryPuzzle(board.shape[1], board.shape[0], loaded_data)
+
 
 def load_binary_puzzle(filename: str) -> BinaryPuzzle:
-    with open(filename, "r", encoding="utf-8") as file:
-        loaded_data = list()
-        y = 0
-        for l in file.readlines():
-            x = 0
-            for c in l:
-                if c == "1":
-                    loaded_data.append(CSP_Answer((x, y), 1))
-                elif c == "0":
-                    loaded_data.append(CSP_Answer((x, y), 0))
-                x += 1
-            y += 1
-        return BinaryPuzzle(x, y, loaded_data)
+    with open(filename, "rb") as file:
+        lines = [l.rstrip(b"\r\n") for l in file]
+    return binary_puzzle_from_board(parse_binary_board([l for l in lines if l]))
 
 
 def solve_puzzle_backtrack(file_name, print_solutions=False, heuristic=SEQUENTIAL_HEURISTIC,
                            domain_heuristic=SEQUENTIAL_HEURISTIC):
     print(
-        f"Trying binary puzzle Backtracking with Heuristic: {'sequential' if heuristic == SEQUENTIAL_HEURISTIC else 'randomised'} and domain {domain_heuristic}")
+        f"Trying binary puzzle Backtracking with Heuristic: {heuristic.lower()} and domain {domain_heuristic}")
     puzzle = load_binary_puzzle(file_name)
     sol, tup = puzzle.try_solve_backtracking(heuristic, domain_heuristic)
     print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(puzzle.is_solution(e) for e in sol)
     if print_solutions:
         i = 1
         for e in sol:
@@ -186,10 +340,62 @@ def solve_puzzle_backtrack(file_name, print_solutions=False, heuristic=SEQUENTIA
 def solve_puzzle_forward(file_name, print_solutions=False, heuristic=SEQUENTIAL_HEURISTIC,
                          domain_hauristic=SEQUENTIAL_HEURISTIC) -> tuple[int, float]:
     print(
-        f"Trying binary puzzle Forward Tracking with Heuristic: {'sequential' if heuristic == SEQUENTIAL_HEURISTIC else 'randomised'} AND DOMAIN: {domain_hauristic}")
+        f"Trying binary puzzle Forward Tracking with Heuristic: {heuristic.lower()} AND DOMAIN: {domain_hauristic}")
     puzzle = load_binary_puzzle(file_name)
     sol, timers = puzzle.try_solve_forward(heuristic, domain_hauristic)
     print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(puzzle.is_solution(e) for e in sol)
+    if print_solutions:
+        i = 1
+        for e in sol:
+            print(f"SOLUTION {i}")
+            print(tabulate(puzzle.binary_puzzle_get_array(e, "x")))
+            i += 1
+    return timers
+
+
+def solve_puzzle_mac(file_name, print_solutions=False, heuristic=SEQUENTIAL_HEURISTIC,
+                     domain_hauristic=SEQUENTIAL_HEURISTIC) -> tuple[int, float]:
+    print(
+        f"Trying binary puzzle MAC with Heuristic: {heuristic.lower()} AND DOMAIN: {domain_hauristic}")
+    puzzle = load_binary_puzzle(file_name)
+    sol, timers = puzzle.try_solve_mac(heuristic, domain_hauristic)
+    print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(puzzle.is_solution(e) for e in sol)
+    if print_solutions:
+        i = 1
+        for e in sol:
+            print(f"SOLUTION {i}")
+            print(tabulate(puzzle.binary_puzzle_get_array(e, "x")))
+            i += 1
+    return timers
+
+
+def solve_puzzle_backjump(file_name, print_solutions=False, heuristic=SEQUENTIAL_HEURISTIC,
+                          domain_hauristic=SEQUENTIAL_HEURISTIC) -> tuple[int, float]:
+    print(
+        f"Trying binary puzzle Backjumping with Heuristic: {heuristic.lower()} AND DOMAIN: {domain_hauristic}")
+    puzzle = load_binary_puzzle(file_name)
+    sol, timers = puzzle.try_solve_backjumping(heuristic, domain_hauristic)
+    print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(puzzle.is_solution(e) for e in sol)
+    if print_solutions:
+        i = 1
+        for e in sol:
+            print(f"SOLUTION {i}")
+            print(tabulate(puzzle.binary_puzzle_get_array(e, "x")))
+            i += 1
+    return timers
+
+
+def solve_puzzle_lines(file_name, print_solutions=False, heuristic=MRV_HEURISTIC,
+                       domain_hauristic=SEQUENTIAL_HEURISTIC) -> tuple[int, float]:
+    print(
+        f"Trying binary puzzle Line patterns with Heuristic: {heuristic.lower()} AND DOMAIN: {domain_hauristic}")
+    puzzle = load_binary_puzzle(file_name)
+    sol, timers = puzzle.try_solve_lines(heuristic, domain_hauristic)
+    print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(puzzle.is_solution(e) for e in sol)
     if print_solutions:
         i = 1
         for e in sol:
@@ -225,36 +431,38 @@ if __name__ == '__main__':
     b = [5, 6]
     c = a + b
 
-    solve_puzzle_forward("dane\\binary_6x6", True, SEQUENTIAL_HEURISTIC, SEQUENTIAL_HEURISTIC)
+    solve_puzzle_forward("dane/binary_6x6", True, SEQUENTIAL_HEURISTIC, SEQUENTIAL_HEURISTIC)
 
     exit(0)
 
     with open("puzzle_results3.txt", "w", encoding="utf-8") as output:
         output.write("input;method;heuristic;domain_heuristic;nodes;time\n")
-        for heuristic in [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC]:
-            for domain_heuristic in [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC]:
-                for input_file in ["dane\\binary_6x6", "dane\\binary_8x8", "dane\\binary_10x10"]:
+        for heuristic in [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, MRV_HEURISTIC]:
+            for domain_heuristic in [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, LCV_HEURISTIC]:
+                for input_file in ["dane/binary_6x6", "dane/binary_8x8", "dane/binary_10x10"]:
                     sol = solve_puzzle_backtrack(input_file, False, heuristic, domain_heuristic)
                     output.write(f"{input_file};backtracking;{heuristic};{domain_heuristic};{sol[0]};{sol[1]}\n")
                     sol = solve_puzzle_forward(input_file, False, heuristic, domain_heuristic)
                     output.write(f"{input_file};forward;{heuristic};{domain_heuristic};{sol[0]};{sol[1]}\n")
+                    sol = solve_puzzle_mac(input_file, False, heuristic, domain_heuristic)
+                    output.write(f"{input_file};mac;{heuristic};{domain_heuristic};{sol[0]};{sol[1]}\n")
     exit()
     print("Solution Test")
-    print(solve_puzzle_forward("dane\\binary_6x6", False, SEQUENTIAL_HEURISTIC))
+    print(solve_puzzle_forward("dane/binary_6x6", False, SEQUENTIAL_HEURISTIC))
     print()
     exit()
 
     print("Time test")
-    solve_puzzle_forward("dane\\binary_6x6", False, SEQUENTIAL_HEURISTIC)
-    solve_puzzle_forward("dane\\binary_6x6", False, RANDOM_HEURISTIC)
-    solve_puzzle_backtrack("dane\\binary_6x6", False, SEQUENTIAL_HEURISTIC)
-    solve_puzzle_backtrack("dane\\binary_6x6", False, RANDOM_HEURISTIC)
+    solve_puzzle_forward("dane/binary_6x6", False, SEQUENTIAL_HEURISTIC)
+    solve_puzzle_forward("dane/binary_6x6", False, RANDOM_HEURISTIC)
+    solve_puzzle_backtrack("dane/binary_6x6", False, SEQUENTIAL_HEURISTIC)
+    solve_puzzle_backtrack("dane/binary_6x6", False, RANDOM_HEURISTIC)
 
-    solve_puzzle_forward("dane\\binary_8x8", False)
-    solve_puzzle_forward("dane\\binary_10x10", False)
+    solve_puzzle_forward("dane/binary_8x8", False)
+    solve_puzzle_forward("dane/binary_10x10", False)
 
-    solve_puzzle_backtrack("dane\\binary_6x6", True)
-    solve_puzzle_backtrack("dane\\binary_8x8", False)
-    solve_puzzle_backtrack("dane\\binary_10x10", False)
+    solve_puzzle_backtrack("dane/binary_6x6", True)
+    solve_puzzle_backtrack("dane/binary_8x8", False)
+    solve_puzzle_backtrack("dane/binary_10x10", False)
 
 # binary_puzzle_tester(CSP_Answer((4, 3), 0), None, puzzle.loaded_data, puzzle)
@@ -0,0 +1,142 @@
+import argparse
+import mmap
+import os
+from typing import Iterator, Optional
+
+import numpy as np
+
+from binary_puzzle import parse_binary_board, binary_puzzle_from_board
+from futoshiki_puzzle import parse_futoshiki_board, futoshiki_from_board
+
+BINARY_PUZZLE = "binary"
+FUTOSHIKI_PUZZLE = "futoshiki"
+
+PACKED_EXTENSION = ".npy"
+
+PARSERS = {
+    BINARY_PUZZLE: parse_binary_board,
+    FUTOSHIKI_PUZZLE: parse_futoshiki_board,
+}
+BUILDERS = {
+    BINARY_PUZZLE: binary_puzzle_from_board,
+    FUTOSHIKI_PUZZLE: futoshiki_from_board,
+}
+# packed corpora are one int8 array: binary (count, rows, columns), futoshiki (count, 3, n, n)
+PACKED_DIMENSIONS = {
+    3: BINARY_PUZZLE,
+    4: FUTOSHIKI_PUZZLE,
+}
+
+
+def record_puzzle_type(content: bytes) -> Optional[str]:
+    # binary puzzles only hold 0/1/x, futoshiki also has - < > and digits, anything else is not a puzzle
+    content = set(content) - set(b"\r\n ")
+    if len(content) == 0:
+        return None
+    if content <= set(b"01x"):
+        return BINARY_PUZZLE
+    if content <= set(b"x-<>0123456789"):
+        return FUTOSHIKI_PUZZLE
+    return None
+
+
+def detect_puzzle_type(file_name: str) -> Optional[str]:
+    try:
+        with open(file_name, "rb") as file:
+            return record_puzzle_type(file.read())
+    except OSError:
+        return None
+
+
+def collect_puzzle_files(inputs: list[str]) -> list[tuple[str, str]]:
+    files = list()
+    for path in inputs:
+        if os.path.isdir(path):
+            names = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+        else:
+            names = [path]
+        for name in names:
+            puzzle_type = detect_puzzle_type(name) if os.path.isfile(name) else None
+            if puzzle_type is not None:
+                files.append((name, puzzle_type))
+    return files
+
+
+def iter_text_records(file_name: str, use_mmap: bool = False) -> Iterator[list[bytes]]:
+    # one puzzle per record, records are separated by empty lines (a single puzzle file is a corpus of one)
+    with open(file_name, "rb") as file:
+        if use_mmap and os.fstat(file.fileno()).st_size > 0:
+            source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            lines = iter(source.readline, b"")
+        else:
+            source = None
+            lines = file
+        record = list()
+        for l in lines:
+            l = l.strip()
+            if l:
+                record.append(l)
+            elif record:
+                yield record
+                record = list()
+        if record:
+            yield record
+        if source is not None:
+            source.close()
+
+
+def parse_record(record: list[bytes]) -> tuple[str, np.ndarray]:
+    puzzle_type = record_puzzle_type(b"".join(record))
+    if puzzle_type is None:
+        raise ValueError(f"Not a puzzle record: {record[0]!r}...")
+    return puzzle_type, PARSERS[puzzle_type](record)
+
+
+def load_packed(file_name: str, use_mmap: bool = False) -> tuple[str, np.ndarray]:
+    # with use_mmap every process reading the corpus shares the same pages instead of its own copy
+    boards = np.load(file_name, mmap_mode="r" if use_mmap else None)
+    if boards.dtype != np.int8 or boards.ndim not in PACKED_DIMENSIONS:
+        raise ValueError(f"Not a packed puzzle corpus: {file_name}")
+    return PACKED_DIMENSIONS[boards.ndim], boards
+
+
+def iter_boards(file_name: str, use_mmap: bool = False) -> Iterator[tuple[str, np.ndarray]]:
+    if file_name.endswith(PACKED_EXTENSION):
+        puzzle_type, boards = load_packed(file_name, use_mmap)
+        for board in boards:
+            yield puzzle_type, board
+    else:
+        for record in iter_text_records(file_name, use_mmap):
+            yield parse_record(record)
+
+
+def iter_puzzles(file_name: str, use_mmap: bool = False):
+    for puzzle_type, board in iter_boards(file_name, use_mmap):
+        yield BUILDERS[puzzle_type](board)
+
+
+def pack_corpus(inputs: list[str], output_file: str) -> int:
+    # every puzzle of a packed corpus has the same type and size
+    boards = list()
+    packed_type = None
+    for name, _ in collect_puzzle_files(inputs):
+        for puzzle_type, board in iter_boards(name):
+            if packed_type is None:
+                packed_type = puzzle_type
+            if puzzle_type != packed_type or (boards and board.shape != boards[0].shape):
+                raise ValueError(f"{name}: a packed corpus holds puzzles of one type and size only")
+            boards.append(board)
+    if not boards:
+        raise ValueError("No puzzles to pack")
+    np.save(output_file, np.stack(boards))
+    return len(boards)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pack text puzzles (one per file, or many per file separated "
+                                                 "by empty lines) into one .npy corpus")
+    parser.add_argument("output", help="packed corpus file (.npy)")
+    parser.add_argument("inputs", nargs="+", help="puzzle files or directories with them")
+    args = parser.parse_args()
+
+    print(f"Packed {pack_corpus(args.inputs, args.output)} puzzles into {args.output}")
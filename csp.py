@@ -1,9 +1,35 @@
+import multiprocessing
+import queue
 import random
 import time
-from typing import Callable, Optional, Any
+import tracemalloc
+from collections import OrderedDict
+from typing import Callable, Optional, Any, Iterable, Iterator, Generator
 
 SEQUENTIAL_HEURISTIC = "SEQUENTIAL"
 RANDOM_HEURISTIC = "RANDOMISED"
+MRV_HEURISTIC = "MRV"  # variables only - minimum remaining values, ties broken by degree
+LCV_HEURISTIC = "LCV"  # domain only - least constraining value first
+
+BACKTRACKING_METHOD = "backtracking"
+FORWARD_METHOD = "forward"
+MAC_METHOD = "mac"
+BACKJUMPING_METHOD = "backjumping"  # conflict-directed backjumping with nogood learning
+
+# why a search stopped
+EXHAUSTED_STATUS = "EXHAUSTED"  # the whole search space was searched
+SOLUTION_LIMIT_STATUS = "SOLUTION_LIMIT"
+NODE_LIMIT_STATUS = "NODE_LIMIT"
+DEADLINE_STATUS = "DEADLINE"
+CANCELLED_STATUS = "CANCELLED"
+
+NOGOOD_CAPACITY = 10000  # learned nogoods kept at once, least recently used ones go first
+NOGOOD_MAX_LENGTH = 8  # longer nogoods are not learned, they would hardly ever match again
+
+EMPTY_CELL = -1  # value of a cell without an answer on the int8 boards the puzzles build (parsing, is_solution)
+
+# solver methods shadowed by their profiled_* version while statistics are collected
+PROFILED_METHODS = ["search", "reset_assignment", "assign", "unassign", "prune_domains", "revise"]
 
 
 class CSP_Answer:
@@ -20,115 +46,1040 @@ class CSP_Answer:
         return self.answer_domain == other.answer_domain and self.variable_position == other.variable_position
 
 
+class CSP_Configuration:
+    # one way of running the solver, a portfolio races several of them
+    def __init__(self, method: str, heuristic: str, domain_heuristic: str, seed: Optional[int] = None,
+                 prefix: Optional[list[CSP_Answer]] = None):
+        self.method = method
+        self.heuristic = heuristic
+        self.domain_heuristic = domain_heuristic
+        self.seed = seed
+        self.prefix = prefix if prefix is not None else list()  # answers fixed on top of start solution (split)
+
+    def __str__(self):
+        prefix = ", ".join(f"{a.variable_position}={a.answer_domain}" for a in self.prefix)
+        return f"{self.method};{self.heuristic};{self.domain_heuristic};seed={self.seed};prefix=[{prefix}]"
+
+
+class CSP_CancelToken:
+    # handed to a search through CSP_Budget, cancel() may be called from another thread
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class CSP_Budget:
+    # bounds of one iterative search, it stops at the first one reached
+    def __init__(self, max_nodes: Optional[int] = None, timeout: Optional[float] = None,
+                 deadline: Optional[float] = None, cancel_token: Optional[CSP_CancelToken] = None):
+        self.max_nodes = max_nodes
+        self.timeout = timeout  # seconds from the start of the search
+        self.deadline = deadline  # absolute, in time.monotonic() seconds
+        self.cancel_token = cancel_token
+
+    def end_time(self) -> Optional[float]:
+        ends = [e for e in [self.deadline, None if self.timeout is None else time.monotonic() + self.timeout]
+                if e is not None]
+        return min(ends) if len(ends) > 0 else None
+
+
+class CSP_SearchResult:
+    # what an iterative search found until it stopped, also when it was stopped early
+    def __init__(self, solutions: list[list[CSP_Answer]], status: str, nodes: int, time_taken: float,
+                 max_depth: int):
+        self.solutions = solutions
+        self.status = status
+        self.nodes = nodes
+        self.time = time_taken
+        self.max_depth = max_depth
+
+    def __str__(self):
+        return f"{self.status}: {len(self.solutions)} solutions, nodes {self.nodes}, max depth {self.max_depth}, " \
+               f"took {self.time}"
+
+
+class CSP_Statistics:
+    # counters of one search run, filled only while the solver collects statistics (see enable_statistics)
+    def __init__(self, method: Optional[str] = None, heuristic: Optional[str] = None,
+                 domain_heuristic: Optional[str] = None):
+        self.method = method
+        self.heuristic = heuristic
+        self.domain_heuristic = domain_heuristic
+        self.nodes = 0
+        self.solutions = 0
+        self.goal_tests = 0
+        self.domain_masks = 0
+        self.arc_tests = 0
+        self.prunings = 0  # values removed from domains, by forward checking and by AC-3
+        self.backtracks = 0  # answers taken back
+        self.clues = 0  # answers set before the search started
+        self.max_depth = 0  # most answers set by the search itself at one time
+        self.check_time = 0.0  # inside goal_test, domain_mask and arc_test
+        self.total_time = 0.0  # inside the search, time spent suspended between solutions is not counted
+        self.peak_memory: Optional[int] = None  # bytes, only with trace_memory
+
+    @property
+    def search_time(self) -> float:
+        return self.total_time - self.check_time
+
+    def as_dict(self) -> dict:
+        result = dict(self.__dict__)
+        result["search_time"] = self.search_time
+        return result
+
+    def __str__(self):
+        return f"{self.method};{self.heuristic};{self.domain_heuristic}: nodes {self.nodes}, " \
+               f"solutions {self.solutions}, goal tests {self.goal_tests}, domain masks {self.domain_masks}, " \
+               f"arc tests {self.arc_tests}, prunings {self.prunings}, backtracks {self.backtracks}, " \
+               f"max depth {self.max_depth}, checks {self.check_time:.4f}s, search {self.search_time:.4f}s, " \
+               f"peak memory {self.peak_memory}"
+
+
+class CSP_Assignment:
+    # current partial solution, indexed by variable position so lookups do not scan a list
+    answers: dict
+
+    def __init__(self, start_solution: Optional[list[CSP_Answer]] = None):
+        self.answers = dict()
+        if start_solution is not None:
+            for answer in start_solution:
+                self.assign(answer)
+
+    def assign(self, answer: CSP_Answer):
+        self.answers[answer.variable_position] = answer
+
+    def unassign(self, answer: CSP_Answer):
+        del self.answers[answer.variable_position]
+
+    def get_answer(self, variable_position, default: Optional[CSP_Answer] = None) -> Optional[CSP_Answer]:
+        return self.answers.get(variable_position, default)
+
+    def to_list(self) -> list[CSP_Answer]:
+        return list(self.answers.values())
+
+    def __contains__(self, variable_position):
+        return variable_position in self.answers
+
+    def __iter__(self):
+        return iter(self.answers.values())
+
+    def __len__(self):
+        return len(self.answers)
+
+
+class MRVQueue:
+    # bucket queue of unassigned variables, smallest domain first, ties broken by the larger degree
+    def __init__(self, sizes: dict, degrees: dict, max_size: int):
+        self.sizes = sizes
+        self.degrees = degrees
+        self.max_degree = max(degrees.values(), default=0)
+        self.buckets = [dict() for _ in range((max_size + 1) * (self.max_degree + 1))]
+        self.queued = dict()  # variable -> bucket it is in, only for variables in the queue
+        self.lowest = 0  # no bucket below it is used
+        for variable in sizes:
+            self.push(variable)
+
+    def bucket_of(self, variable) -> int:
+        return self.sizes[variable] * (self.max_degree + 1) + self.max_degree - self.degrees[variable]
+
+    def push(self, variable):
+        bucket = self.bucket_of(variable)
+        self.buckets[bucket][variable] = None
+        self.queued[variable] = bucket
+        if bucket < self.lowest:
+            self.lowest = bucket
+
+    def pop(self):
+        while len(self.buckets[self.lowest]) == 0:
+            self.lowest += 1
+        bucket = self.buckets[self.lowest]
+        variable = next(iter(bucket))
+        del bucket[variable]
+        del self.queued[variable]
+        return variable
+
+    def update(self, variable, size: int):
+        self.sizes[variable] = size
+        bucket = self.queued.get(variable)
+        if bucket is not None:
+            del self.buckets[bucket][variable]
+            self.push(variable)
+
+    def __len__(self):
+        return len(self.queued)
+
+
+class NogoodStore:
+    # learned nogoods - answers that can not be all part of a solution together, bounded LRU cache.
+    # A nogood is watched by one answer only, the one assigned last when it was learned: with a static variable
+    # order that answer is again the last one to complete it, with MRV some matches are missed (never wrong ones).
+    def __init__(self, capacity: int = NOGOOD_CAPACITY, max_length: int = NOGOOD_MAX_LENGTH):
+        self.capacity = capacity
+        self.max_length = max_length
+        # watch answer (variable, value) -> other answers of the nogood, deepest first, so a check fails early
+        self.nogoods: OrderedDict[tuple, tuple] = OrderedDict()  # (watch, others) -> watch
+        self.watches: dict[tuple, dict[tuple, None]] = dict()
+        self.learned = 0
+        self.evicted = 0
+        self.hits = 0
+
+    def add(self, watch: tuple, others: tuple):
+        key = (watch, others)
+        if len(others) + 1 > self.max_length or key in self.nogoods or self.capacity <= 0:
+            return
+        if len(self.nogoods) >= self.capacity:
+            (oldest_watch, oldest_others), _ = self.nogoods.popitem(last=False)
+            del self.watches[oldest_watch][oldest_others]
+            self.evicted += 1
+        self.nogoods[key] = watch
+        self.watches.setdefault(watch, dict())[others] = None
+        self.learned += 1
+
+    def find(self, answer: CSP_Answer, assignment: CSP_Assignment) -> Optional[tuple]:
+        # other answers of a nogood that answer would complete, given the current assignment
+        watch = (answer.variable_position, answer.answer_domain)
+        watched = self.watches.get(watch)
+        if not watched:
+            return None
+        answers = assignment.answers
+        for others in watched:
+            for variable, value in others:
+                other = answers.get(variable)
+                if other is None or other.answer_domain != value:
+                    break
+            else:
+                self.nogoods.move_to_end((watch, others))
+                self.hits += 1
+                return others
+        return None
+
+    def __len__(self):
+        return len(self.nogoods)
+
+
 class CSP_Solver:
     variables: list  # w binary - pozycje wszystkie wolne, w futuszimie - wszystkie wolne pola
     domain: list  # lista numerów
+    assignment: CSP_Assignment  # aktualne przypisanie, przekazywane do goal_test zamiast listy
 
-    def __init__(self, domain, goal_test, additional_data: Optional = None, variables: Optional[list] = None):
+    def __init__(self, domain, goal_test, additional_data: Optional = None, variables: Optional[list] = None,
+                 on_reset: Optional[Callable] = None, on_assign: Optional[Callable] = None,
+                 on_unassign: Optional[Callable] = None, domain_mask: Optional[Callable] = None,
+                 neighbours: Optional[Callable] = None, arcs: Optional[Callable] = None,
+                 arc_test: Optional[Callable] = None, conflicts: Optional[Callable] = None):
         self.variables = variables
         self.domain = domain
         self.additional_data = additional_data
-        self.goal_test: Callable[[CSP_Answer, CSP_Solver, list[CSP_Answer], Optional], bool] = goal_test
+        self.goal_test: Callable[[CSP_Answer, CSP_Solver, CSP_Assignment, Optional], bool] = goal_test
+        # optional listeners, so a problem can keep its own incremental state in sync with the assignment
+        self.on_reset: Optional[Callable[[CSP_Solver, Optional], None]] = on_reset
+        self.on_assign: Optional[Callable[[CSP_Answer, CSP_Solver, Optional], None]] = on_assign
+        self.on_unassign: Optional[Callable[[CSP_Answer, CSP_Solver, Optional], None]] = on_unassign
+        # optional, returns the values still allowed for a variable as a bitmask (bit i <=> domain[i]);
+        # when given, forward checking prunes with it instead of calling goal_test for every value
+        self.domain_mask: Optional[Callable[[Any, CSP_Solver, Optional], int]] = domain_mask
+        self.domain_index = {d: i for i, d in enumerate(domain)}
+        # optional, variables sharing a constraint with the given one; forward checking then re-filters only those
+        self.neighbours: Optional[Callable[[Any, CSP_Solver, Optional], Iterable]] = neighbours
+        # optional binary constraints used by try_mac: arcs(x) lists the variables x shares a binary constraint with,
+        # arc_test(xi, vi, xj, vj) checks one pair of values (it may also look at the current assignment)
+        self.arcs: Optional[Callable[[Any, CSP_Solver, Optional], Iterable]] = arcs
+        self.arc_test: Optional[Callable[[Any, Any, Any, Any, CSP_Solver, Optional], bool]] = arc_test
+        # optional, for backjumping: the variables an answer rejected by goal_test conflicts with;
+        # without it every assigned neighbour is blamed (every assigned variable when there are no neighbours)
+        self.conflicts: Optional[Callable[[CSP_Answer, CSP_Solver, Optional], Iterable]] = conflicts
+        self.nogoods = NogoodStore()
+        self.assigned_at = dict()  # variable -> search depth it was assigned at, backjumping only
+        self.stop_reason: Optional[str] = None  # of the last iterative search, None while it runs
+        self.reached_depth = 0  # deepest node of the last iterative search
+        self.nogood_capacity = NOGOOD_CAPACITY
+        self.nogood_max_length = NOGOOD_MAX_LENGTH
+        self.supports = dict()
+        self.support_trail = list()
+        self.variable_set = set()
+        self.variable_queue: Optional[MRVQueue] = None  # only used with MRV_HEURISTIC
+        self.count_trail = list()  # old MRV sizes replaced during plain backtracking
+        self.assignment = CSP_Assignment()
+        self.statistics: Optional[CSP_Statistics] = None  # of the last run, only when statistics are collected
+        self.on_statistics: Optional[Callable[[CSP_Statistics], None]] = None
+        self.trace_memory = False
+        self.plain_callbacks: Optional[tuple] = None  # goal_test, domain_mask, arc_test while they are wrapped
+
+    def reset_assignment(self, start_solution: list[CSP_Answer]):
+        self.assignment = CSP_Assignment()
+        if self.on_reset is not None:
+            self.on_reset(self, self.additional_data)
+        for answer in start_solution:
+            self.assign(answer)
+
+    def assign(self, answer: CSP_Answer):
+        self.assignment.assign(answer)
+        if self.on_assign is not None:
+            self.on_assign(answer, self, self.additional_data)
+
+    def unassign(self, answer: CSP_Answer):
+        self.assignment.unassign(answer)
+        if self.on_unassign is not None:
+            self.on_unassign(answer, self, self.additional_data)
 
     def try_backtrack(self, start_solution: list[CSP_Answer], heuristic: str, domain_hauristic: str) -> tuple[
         list[list[CSP_Answer]], tuple]:
-        total_solutions = list()
-        variables_counter = list(self.variables)
+        return self.try_first_solution(start_solution, BACKTRACKING_METHOD, heuristic, domain_hauristic, "Backtrack")
+
+    def iter_solutions(self, start_solution: list[CSP_Answer], limit: Optional[int] = None,
+                       method: str = FORWARD_METHOD, heuristic: str = SEQUENTIAL_HEURISTIC,
+                       domain_heuristic: str = SEQUENTIAL_HEURISTIC,
+                       number_of_enters: Optional[dict] = None, budget: Optional[CSP_Budget] = None,
+                       iterative: bool = False) -> Iterator[list[CSP_Answer]]:
+        # yields solutions one by one, the search is suspended in between and stops after limit of them
+        found = 0
+        if limit is not None and limit <= 0:
+            return
+        for _ in self.search(start_solution, method, heuristic, domain_heuristic, number_of_enters, budget,
+                             iterative):
+            yield self.assignment.to_list()
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+    def count_solutions(self, start_solution: list[CSP_Answer], limit: Optional[int] = None,
+                        method: str = FORWARD_METHOD, heuristic: str = SEQUENTIAL_HEURISTIC,
+                        domain_heuristic: str = SEQUENTIAL_HEURISTIC, budget: Optional[CSP_Budget] = None,
+                        iterative: bool = False) -> int:
+        # like iter_solutions, but solutions are only counted, never copied (limit=2 tells if a puzzle is unique)
+        found = 0
+        if limit is not None and limit <= 0:
+            return found
+        for _ in self.search(start_solution, method, heuristic, domain_heuristic, None, budget, iterative):
+            found += 1
+            if limit is not None and found >= limit:
+                break
+        return found
+
+    def search(self, start_solution: list[CSP_Answer], method: str, heuristic: str, domain_heuristic: str,
+               number_of_enters: Optional[dict] = None, budget: Optional[CSP_Budget] = None,
+               iterative: bool = False) -> Iterator[None]:
+        # yields once for every solution, the solution itself is the current self.assignment;
+        # a budget always runs the iterative engine, whose stop reason is left in self.stop_reason
+        if number_of_enters is None:
+            number_of_enters = {"number": 0}
+        if iterative or budget is not None:
+            if method not in [BACKTRACKING_METHOD, FORWARD_METHOD, MAC_METHOD]:
+                raise ValueError(f"Method {method} has no iterative engine")
+            if method == MAC_METHOD:
+                assert self.arcs is not None and self.arc_test is not None
+            return self.iterative_search(start_solution, method, heuristic, domain_heuristic, number_of_enters,
+                                         budget if budget is not None else CSP_Budget())
+        if method == BACKTRACKING_METHOD:
+            return self.backtracking_search(start_solution, heuristic, domain_heuristic, number_of_enters)
+        if method == FORWARD_METHOD:
+            return self.forward_search(start_solution, heuristic, domain_heuristic, False, number_of_enters)
+        if method == MAC_METHOD:
+            assert self.arcs is not None and self.arc_test is not None
+            return self.forward_search(start_solution, heuristic, domain_heuristic, True, number_of_enters)
+        if method == BACKJUMPING_METHOD:
+            return self.backjumping_search(start_solution, heuristic, domain_heuristic, number_of_enters)
+        raise ValueError(f"Unknown method {method}")
+
+    def backtracking_search(self, start_solution: list[CSP_Answer], heuristic: str, domain_heuristic: str,
+                            number_of_enters: dict) -> Iterator[None]:
+        self.reset_assignment(start_solution)
+        # variables already set by start_solution (clues or a split prefix) are not searched
+        variables_counter = [v for v in self.variables if v not in self.assignment]
         if heuristic == RANDOM_HEURISTIC:
             random.shuffle(variables_counter)
+        self.start_variable_order(heuristic, variables_counter, self.count_values)
+        yield from self.backtracking_recurrence(variables_counter, 0, number_of_enters, domain_heuristic)
+
+    def backtracking_recurrence(self, variables: list, variable_index: int, number_of_enters: dict,
+                                domain_heuristic: str) -> Iterator[None]:
+        number_of_enters["number"] += 1
+        if len(variables) == variable_index:
+            yield
+        else:
+            variable = self.next_variable(variables, variable_index)
+            domain = self.order_values(variable, list(self.domain), None, domain_heuristic)
+            for d in domain:
+                answer = CSP_Answer(variable, d)
+                if self.goal_test(answer, self, self.assignment, self.additional_data):
+                    self.assign(answer)
+                    count_mark = len(self.count_trail)
+                    if self.variable_queue is not None:
+                        self.recount_values(self.affected_variables(variable, variables))
+                    yield from self.backtracking_recurrence(variables, variable_index + 1, number_of_enters,
+                                                            domain_heuristic)
+                    self.restore_counts(count_mark)
+                    self.unassign(answer)
+            self.release_variable(variable)
+
+    def solve(self, start_solution: list[CSP_Answer], method: str = FORWARD_METHOD,
+              heuristic: str = SEQUENTIAL_HEURISTIC, domain_heuristic: str = SEQUENTIAL_HEURISTIC,
+              limit: Optional[int] = 1, budget: Optional[CSP_Budget] = None) -> CSP_SearchResult:
+        # bounded search on the iterative engine, the result says why it stopped and what it got until then
         number_of_enters = {"number": 0}
+        self.stop_reason = None
+        self.reached_depth = 0
         timer = time.time()
-        self.backtracking_recurrence(start_solution, list(self.variables), total_solutions, 0, number_of_enters,
-                                     domain_hauristic)
+        solutions = list(self.iter_solutions(start_solution, limit, method, heuristic, domain_heuristic,
+                                             number_of_enters, budget, True))
         end = time.time()
+        status = self.stop_reason if self.stop_reason is not None else SOLUTION_LIMIT_STATUS
+        return CSP_SearchResult(solutions, status, number_of_enters["number"], end - timer, self.reached_depth)
 
-        print(f"Backtrack: Total nodes entered: {number_of_enters['number']}. Took {end - timer}")
-        return total_solutions, (number_of_enters['number'], end - timer)
+    def iterative_search(self, start_solution: list[CSP_Answer], method: str, heuristic: str,
+                         domain_heuristic: str, number_of_enters: dict, budget: CSP_Budget) -> Iterator[None]:
+        # backtracking_recurrence / forward_checking_recurrence with an explicit stack instead of the call stack,
+        # so board size is not bound by the recursion limit and the budget can be checked at every node
+        self.stop_reason = None
+        self.reached_depth = 0
+        forward = method != BACKTRACKING_METHOD
+        arc_consistency = method == MAC_METHOD
+        self.reset_assignment(start_solution)
+        variables = [v for v in self.variables if v not in self.assignment]
+        if heuristic == RANDOM_HEURISTIC:
+            random.shuffle(variables)
+        domains = None
+        trail = list()
+        if forward:
+            domains = {variable: list(self.domain) for variable in variables}
+            self.supports = dict()
+            self.support_trail = list()
+            self.variable_set = set(variables)
+            self.variable_queue = None
+            consistent = (self.neighbours is None and not arc_consistency) or self.prune_domains(variables, domains,
+                                                                                                 trail)
+            if consistent and arc_consistency:
+                consistent = self.propagate_arcs(
+                    [(xi, xj) for xi in variables for xj in self.unassigned_arcs(xi, domains)], domains, trail)
+            if not consistent:
+                self.stop_reason = EXHAUSTED_STATUS
+                return
+            self.start_variable_order(heuristic, variables, lambda v: len(domains[v]))
+        else:
+            self.start_variable_order(heuristic, variables, self.count_values)
 
-    def backtracking_recurrence(self, current_solution: list[CSP_Answer], variable_solutions_list: list,
-                                total_solutions: list[list[CSP_Answer]], variable_index: int, number_of_enters: dict,
-                                domain_heuristic: str):
-        if len(total_solutions) > 0:
-            return
+        max_nodes = None if budget.max_nodes is None else number_of_enters["number"] + budget.max_nodes
+        end_time = budget.end_time()
+        cancel_token = budget.cancel_token
+        # frame: [variable, values to try, next value index, answer being tried, trail, support and count marks]
+        stack = list()
+        enter = True
+        while True:
+            if enter:
+                # a new node, like a call of the recurrence
+                if max_nodes is not None and number_of_enters["number"] >= max_nodes:
+                    self.stop_reason = NODE_LIMIT_STATUS
+                    return
+                if end_time is not None and time.monotonic() >= end_time:
+                    self.stop_reason = DEADLINE_STATUS
+                    return
+                if cancel_token is not None and cancel_token.cancelled:
+                    self.stop_reason = CANCELLED_STATUS
+                    return
+                number_of_enters["number"] += 1
+                if len(stack) > self.reached_depth:
+                    self.reached_depth = len(stack)
+                if len(stack) == len(variables):
+                    yield
+                else:
+                    variable = self.next_variable(variables, len(stack))
+                    if not forward:
+                        values = self.order_values(variable, list(self.domain), None, domain_heuristic)
+                    elif len(domains[variable]) == 1:
+                        values = list(domains[variable])
+                    else:
+                        assert len(domains[variable]) > 0
+                        values = self.order_values(variable, list(domains[variable]), domains, domain_heuristic)
+                    stack.append([variable, values, 0, None, 0, 0, 0])
+            if len(stack) == 0:
+                self.stop_reason = EXHAUSTED_STATUS
+                return
+            frame = stack[-1]
+            variable, values = frame[0], frame[1]
+            if frame[3] is not None:
+                # back from the child, take the answer back
+                if forward:
+                    self.undo_trail(domains, trail, frame[4])
+                    self.undo_supports(frame[5])
+                else:
+                    self.restore_counts(frame[6])
+                self.unassign(frame[3])
+                frame[3] = None
+            enter = False
+            while frame[2] < len(values):
+                answer = CSP_Answer(variable, values[frame[2]])
+                frame[2] += 1
+                if not self.goal_test(answer, self, self.assignment, self.additional_data):
+                    continue
+                self.assign(answer)
+                frame[3] = answer
+                if forward:
+                    frame[4] = len(trail)
+                    frame[5] = len(self.support_trail)
+                    single = len(values) == 1 and self.neighbours is None and not arc_consistency
+                    if single or self.propagate(variable, variables, domains, trail, arc_consistency):
+                        enter = True
+                        break
+                    self.undo_trail(domains, trail, frame[4])
+                    self.undo_supports(frame[5])
+                    self.unassign(answer)
+                    frame[3] = None
+                else:
+                    frame[6] = len(self.count_trail)
+                    if self.variable_queue is not None:
+                        self.recount_values(self.affected_variables(variable, variables))
+                    enter = True
+                    break
+            if not enter:
+                self.release_variable(variable)
+                stack.pop()
+
+    def try_backjump(self, start_solution: list[CSP_Answer], heuristic: str, domain_heuristic: str):
+        return self.try_first_solution(start_solution, BACKJUMPING_METHOD, heuristic, domain_heuristic, "Backjumping")
+
+    def backjumping_search(self, start_solution: list[CSP_Answer], heuristic: str, domain_heuristic: str,
+                           number_of_enters: dict) -> Iterator[None]:
+        self.reset_assignment(start_solution)
+        variables = [v for v in self.variables if v not in self.assignment]
+        if heuristic == RANDOM_HEURISTIC:
+            random.shuffle(variables)
+        self.start_variable_order(heuristic, variables, self.count_values)
+        # nogoods hold for the given start solution only
+        self.nogoods = NogoodStore(self.nogood_capacity, self.nogood_max_length)
+        self.assigned_at = dict()
+        yield from self.backjumping_recurrence(variables, 0, number_of_enters, domain_heuristic)
+
+    def backjumping_recurrence(self, variables: list, variable_index: int, number_of_enters: dict,
+                               domain_heuristic: str) -> Generator[None, None, Optional[set]]:
+        # Returns the conflict set of a dead end - the assigned variables that caused it - or None when a solution
+        # was found below (the parent then has to go on chronologically, jumping could skip other solutions).
         number_of_enters["number"] += 1
-        if len(variable_solutions_list) == variable_index:
-            total_solutions.append(current_solution)
-            if len(total_solutions) == 1:
-                print("Found one solution!")
+        if len(variables) == variable_index:
+            yield
+            return None
+        variable = self.next_variable(variables, variable_index)
+        conflict_set = set()
+        found = False
+        jumped = False
+        for d in self.order_values(variable, list(self.domain), None, domain_heuristic):
+            answer = CSP_Answer(variable, d)
+            nogood = self.nogoods.find(answer, self.assignment)
+            if nogood is not None:
+                conflict_set.update(v for v, _ in nogood)
+                continue
+            if not self.goal_test(answer, self, self.assignment, self.additional_data):
+                conflict_set.update(self.conflicting_variables(answer))
+                continue
+            self.assign(answer)
+            self.assigned_at[variable] = variable_index
+            count_mark = len(self.count_trail)
+            if self.variable_queue is not None:
+                self.recount_values(self.affected_variables(variable, variables))
+            below = yield from self.backjumping_recurrence(variables, variable_index + 1, number_of_enters,
+                                                           domain_heuristic)
+            self.restore_counts(count_mark)
+            self.unassign(answer)
+            if below is None:
+                found = True
+            elif variable not in below:
+                # the dead end below does not depend on this variable, none of its other values can help
+                conflict_set = below
+                jumped = True
+                break
+            else:
+                below.discard(variable)
+                conflict_set.update(below)
+        self.release_variable(variable)
+        if found:
+            return None
+        if not jumped and len(conflict_set) > 0:
+            # after a jump the dead end below has learned this nogood already
+            nogood = [(v, self.assignment.get_answer(v).answer_domain)
+                      for v in sorted(conflict_set, key=self.assigned_at.__getitem__, reverse=True)]
+            self.nogoods.add(nogood[0], tuple(nogood[1:]))
+        return conflict_set
+
+    def conflicting_variables(self, answer: CSP_Answer) -> list:
+        if self.conflicts is not None:
+            culprits = self.conflicts(answer, self, self.additional_data)
+        elif self.neighbours is not None:
+            culprits = self.neighbours(answer.variable_position, self, self.additional_data)
         else:
-            variable = variable_solutions_list[variable_index]
-            domain = list(self.domain)
-            if domain_heuristic == RANDOM_HEURISTIC:
-                random.shuffle(domain)
-            for d in domain:
-                answer = CSP_Answer(variable, d)
-                if self.goal_test(answer, self, current_solution, self.additional_data):
-                    l = list(current_solution)
-                    l.append(answer)
-                    self.backtracking_recurrence(l, variable_solutions_list, total_solutions, variable_index + 1,
-                                                 number_of_enters, domain_heuristic)
+            culprits = self.variable_set
+        # answers from the start solution never change, they are no culprits
+        return [v for v in culprits
+                if v != answer.variable_position and v in self.variable_set and v in self.assignment]
+
+    def start_variable_order(self, heuristic: str, variables: list, size_of: Callable[[Any], int]):
+        self.variable_set = set(variables)
+        self.count_trail = list()
+        if heuristic != MRV_HEURISTIC:
+            self.variable_queue = None
+            return
+        sizes = dict()
+        degrees = dict()
+        for variable in variables:
+            sizes[variable] = size_of(variable)
+            if self.neighbours is not None:
+                degrees[variable] = len(list(self.neighbours(variable, self, self.additional_data)))
+            elif self.arcs is not None:
+                degrees[variable] = len(list(self.arcs(variable, self, self.additional_data)))
+            else:
+                degrees[variable] = 0
+        self.variable_queue = MRVQueue(sizes, degrees, len(self.domain))
+
+    def next_variable(self, variables: list, variable_index: int):
+        if self.variable_queue is None:
+            return variables[variable_index]
+        return self.variable_queue.pop()
+
+    def release_variable(self, variable):
+        if self.variable_queue is not None:
+            self.variable_queue.push(variable)
+
+    def order_values(self, variable, values: list, domains: Optional[dict[Any, list]], domain_heuristic: str) -> list:
+        if domain_heuristic == RANDOM_HEURISTIC:
+            random.shuffle(values)
+        elif domain_heuristic == LCV_HEURISTIC:
+            values.sort(key=lambda d: self.eliminated_values(variable, d, domains))
+        return values
+
+    def eliminated_values(self, variable, value, domains: Optional[dict[Any, list]]) -> int:
+        # LCV key - how many values of the unassigned neighbours would go if variable took value.
+        # Uses the binary constraints when there are any, otherwise counts neighbours that still hold the same value.
+        # Plain backtracking has no domains, the domain mask (or the full domain) stands in for them.
+        eliminated = 0
+        if self.arcs is not None and self.arc_test is not None:
+            for n in self.arcs(variable, self, self.additional_data):
+                if n in self.variable_set and n not in self.assignment:
+                    for vn in self.live_values(n, domains):
+                        if not self.arc_test(variable, value, n, vn, self, self.additional_data):
+                            eliminated += 1
+        else:
+            for n in self.affected_variables(variable, self.variable_set):
+                if value in self.live_values(n, domains):
+                    eliminated += 1
+        return eliminated
+
+    def live_values(self, variable, domains: Optional[dict[Any, list]]) -> list:
+        if domains is not None:
+            return domains[variable]
+        if self.domain_mask is not None:
+            mask = self.domain_mask(variable, self, self.additional_data)
+            return [d for d in self.domain if mask >> self.domain_index[d] & 1]
+        return self.domain
+
+    def count_values(self, variable) -> int:
+        # number of values consistent with the current assignment, MRV key when there are no domains to look at
+        if self.domain_mask is not None:
+            return bin(self.domain_mask(variable, self, self.additional_data)).count("1")
+        return sum(1 for d in self.domain if self.goal_test(CSP_Answer(variable, d), self, self.assignment,
+                                                            self.additional_data))
+
+    def recount_values(self, variables: list):
+        for variable in variables:
+            size = self.count_values(variable)
+            if size != self.variable_queue.sizes[variable]:
+                self.count_trail.append((variable, self.variable_queue.sizes[variable]))
+                self.variable_queue.update(variable, size)
+
+    def restore_counts(self, count_mark: int):
+        while len(self.count_trail) > count_mark:
+            variable, size = self.count_trail.pop()
+            self.variable_queue.update(variable, size)
 
     def try_forward(self, start_solution: list[CSP_Answer], heuristic: str, domain_heuristic: str):
-        total_solutions = list()
-        tf = list(map(lambda d: (d, list(self.domain)), self.variables))
+        return self.try_first_solution(start_solution, FORWARD_METHOD, heuristic, domain_heuristic, "Forward checking")
+
+    def try_mac(self, start_solution: list[CSP_Answer], heuristic: str, domain_heuristic: str):
+        # forward checking followed by AC-3 after every assignment (maintaining arc consistency)
+        return self.try_first_solution(start_solution, MAC_METHOD, heuristic, domain_heuristic, "MAC")
+
+    def try_first_solution(self, start_solution: list[CSP_Answer], method: str, heuristic: str,
+                           domain_heuristic: str, name: str):
         number_of_enters = {"number": 0}
-        if heuristic == RANDOM_HEURISTIC:
-            random.shuffle(tf)
         timer = time.time()
-        self.forward_checking_recurrence(start_solution, tf, total_solutions, 0, number_of_enters, domain_heuristic)
+        total_solutions = list(self.iter_solutions(start_solution, 1, method, heuristic, domain_heuristic,
+                                                   number_of_enters))
         end = time.time()
-        print(f"Forward checking: Total nodes entered: {number_of_enters['number']}. Took {end - timer}")
+        if len(total_solutions) > 0:
+            print("Found one solution!")
+        print(f"{name}: Total nodes entered: {number_of_enters['number']}. Took {end - timer}")
         return total_solutions, (number_of_enters['number'], end - timer)
 
-    def forward_checking_recurrence(self, current_solution: list[CSP_Answer],
-                                    variable_solutions_list: list[Any, list[Any]],
-                                    total_solutions: list[list[CSP_Answer]], variable_index: int,
-                                    number_of_enters: dict, domain_heuristic):
-        number_of_enters["number"] += 1
-        if len(total_solutions) > 0:
-            return
+    def forward_search(self, start_solution: list[CSP_Answer], heuristic: str, domain_heuristic: str,
+                       arc_consistency: bool, number_of_enters: dict) -> Iterator[None]:
+        self.reset_assignment(start_solution)
+        variables = [v for v in self.variables if v not in self.assignment]
+        domains = {variable: list(self.domain) for variable in variables}
+        if heuristic == RANDOM_HEURISTIC:
+            random.shuffle(variables)
+        self.supports = dict()
+        self.support_trail = list()
+        self.variable_set = set(variables)
+        self.variable_queue = None
+        trail = list()
+        # with neighbours only the affected domains are re-filtered, so they have to start consistent with the clues
+        consistent = (self.neighbours is None and not arc_consistency) or self.prune_domains(variables, domains, trail)
+        if consistent and arc_consistency:
+            consistent = self.propagate_arcs([(xi, xj) for xi in variables for xj in self.unassigned_arcs(xi, domains)],
+                                             domains, trail)
+        if consistent:
+            self.start_variable_order(heuristic, variables, lambda v: len(domains[v]))
+            yield from self.forward_checking_recurrence(variables, domains, trail, 0, number_of_enters,
+                                                        domain_heuristic, arc_consistency)
 
-        if len(variable_solutions_list) == variable_index:
-            total_solutions.append(current_solution)
-            if len(total_solutions) == 1:
-                print("Found one solution!")
+    def forward_checking_recurrence(self, variables: list, domains: dict[Any, list], trail: list[tuple[Any, int, Any]],
+                                    variable_index: int, number_of_enters: dict, domain_heuristic,
+                                    arc_consistency: bool = False) -> Iterator[None]:
+        number_of_enters["number"] += 1
+        if len(variables) == variable_index:
+            yield
         else:
-            variable, domain = variable_solutions_list[variable_index]
+            variable = self.next_variable(variables, variable_index)
+            domain = domains[variable]
             assert len(domain) > 0
             if len(domain) == 1:
                 answer = CSP_Answer(variable, domain[0])
-                current = current_solution + [answer]
-                if self.goal_test(answer, self, current, self.additional_data):
-                    self.forward_checking_recurrence(current, variable_solutions_list, total_solutions,
-                                                     variable_index + 1, number_of_enters, domain_heuristic)
+                if self.goal_test(answer, self, self.assignment, self.additional_data):
+                    self.assign(answer)
+                    trail_mark = len(trail)
+                    support_mark = len(self.support_trail)
+                    if (self.neighbours is None and not arc_consistency) or self.propagate(
+                            variable, variables, domains, trail, arc_consistency):
+                        yield from self.forward_checking_recurrence(variables, domains, trail, variable_index + 1,
+                                                                    number_of_enters, domain_heuristic,
+                                                                    arc_consistency)
+                    self.undo_trail(domains, trail, trail_mark)
+                    self.undo_supports(support_mark)
+                    self.unassign(answer)
             else:
-                if domain_heuristic == RANDOM_HEURISTIC:
-                    random.shuffle(domain)
-                for d in list(domain):
+                domain = self.order_values(variable, list(domain), domains, domain_heuristic)
+                for d in domain:
                     answer = CSP_Answer(variable, d)
-                    if self.goal_test(answer, self, current_solution, self.additional_data):
-                        curr_sol = current_solution + [answer]
-                        assert curr_sol != current_solution
-                        variables = variable_deep_clone(variable_solutions_list)
-                        invalid = False
-                        v = variable_index
-                        # for variable, domain in variables:
-                        for i in range(v + 1, len(variables)):
-                            var_in, do_in = variables[i]
-                            do_in: list
-                            for do in list(do_in):
-                                if not self.goal_test(CSP_Answer(var_in, do), self, curr_sol, self.additional_data):
-                                    do_in.remove(do)
-                                if len(do_in) == 0:
-                                    invalid = True
-                                    break
-                        if not invalid:
-                            self.forward_checking_recurrence(curr_sol, variables, total_solutions, v + 1,
-                                                             number_of_enters, domain_heuristic)
-
-
-def variable_deep_clone(variable_solutions_list: list[Any, list[Any]]):
-    l = list()
-    for variable, domain in variable_solutions_list:
-        l.append((variable, list(domain)))
-    return l
+                    if self.goal_test(answer, self, self.assignment, self.additional_data):
+                        self.assign(answer)
+                        trail_mark = len(trail)
+                        support_mark = len(self.support_trail)
+                        if self.propagate(variable, variables, domains, trail, arc_consistency):
+                            yield from self.forward_checking_recurrence(variables, domains, trail, variable_index + 1,
+                                                                        number_of_enters, domain_heuristic,
+                                                                        arc_consistency)
+                        self.undo_trail(domains, trail, trail_mark)
+                        self.undo_supports(support_mark)
+                        self.unassign(answer)
+            self.release_variable(variable)
+
+    def propagate(self, variable, variables: list, domains: dict[Any, list], trail: list[tuple[Any, int, Any]],
+                  arc_consistency: bool) -> bool:
+        trail_mark = len(trail)
+        if not self.prune_domains(self.affected_variables(variable, variables), domains, trail):
+            return False
+        if not arc_consistency:
+            return True
+        changed = {entry[0] for entry in trail[trail_mark:]}
+        return self.propagate_arcs([(xk, xj) for xj in changed for xk in self.unassigned_arcs(xj, domains)], domains,
+                                   trail)
+
+    def unassigned_arcs(self, variable, domains: dict[Any, list]) -> list:
+        return [n for n in self.arcs(variable, self, self.additional_data) if n in domains and n not in self.assignment]
+
+    def propagate_arcs(self, queue: list[tuple[Any, Any]], domains: dict[Any, list],
+                       trail: list[tuple[Any, int, Any]]) -> bool:
+        # AC-3, queue holds arcs (xi, xj) meaning "every value of xi needs a support in xj"
+        queued = set(queue)
+        while len(queue) > 0:
+            arc = queue.pop()
+            queued.discard(arc)
+            xi, xj = arc
+            if self.revise(xi, xj, domains, trail):
+                if len(domains[xi]) == 0:
+                    return False
+                for xk in self.unassigned_arcs(xi, domains):
+                    if xk != xj and (xk, xi) not in queued:
+                        queued.add((xk, xi))
+                        queue.append((xk, xi))
+        return True
+
+    def revise(self, xi, xj, domains: dict[Any, list], trail: list[tuple[Any, int, Any]]) -> bool:
+        domain = domains[xi]
+        removed = False
+        j = 0
+        while j < len(domain):
+            if self.has_support(xi, domain[j], xj, domains[xj]):
+                j += 1
+            else:
+                trail.append((xi, j, domain.pop(j)))
+                removed = True
+        if removed and self.variable_queue is not None:
+            self.variable_queue.update(xi, len(domain))
+        return removed
+
+    def has_support(self, xi, vi, xj, domain_j: list) -> bool:
+        # AC-2001: the last support found is cached, search resumes after it in domain order.
+        # Domains only shrink and arc tests only get stricter going down the tree, so values before it can be skipped.
+        key = (xi, vi, xj)
+        last = self.supports.get(key)
+        start = 0
+        if last is not None:
+            if last in domain_j and self.arc_test(xi, vi, xj, last, self, self.additional_data):
+                return True
+            start = self.domain_index[last] + 1
+        for vj in domain_j:
+            if self.domain_index[vj] >= start and self.arc_test(xi, vi, xj, vj, self, self.additional_data):
+                self.support_trail.append((key, last))
+                self.supports[key] = vj
+                return True
+        return False
+
+    def undo_supports(self, support_mark: int):
+        while len(self.support_trail) > support_mark:
+            key, last = self.support_trail.pop()
+            if last is None:
+                del self.supports[key]
+            else:
+                self.supports[key] = last
+
+    def affected_variables(self, variable, variables: list) -> list:
+        if self.neighbours is None:
+            return [v for v in variables if v not in self.assignment]
+        return [n for n in self.neighbours(variable, self, self.additional_data)
+                if n in self.variable_set and n not in self.assignment]
+
+    def prune_domains(self, variables: list, domains: dict[Any, list], trail: list[tuple[Any, int, Any]]) -> bool:
+        # removes values inconsistent with the current assignment, every removal is recorded on the trail
+        for variable in variables:
+            domain = domains[variable]
+            j = 0
+            if self.domain_mask is not None:
+                mask = self.domain_mask(variable, self, self.additional_data)
+                while j < len(domain):
+                    if mask >> self.domain_index[domain[j]] & 1:
+                        j += 1
+                    else:
+                        trail.append((variable, j, domain.pop(j)))
+            else:
+                while j < len(domain):
+                    if self.goal_test(CSP_Answer(variable, domain[j]), self, self.assignment, self.additional_data):
+                        j += 1
+                    else:
+                        trail.append((variable, j, domain.pop(j)))
+            if self.variable_queue is not None:
+                self.variable_queue.update(variable, len(domain))
+            if len(domain) == 0:
+                return False
+        return True
+
+    def undo_trail(self, domains: dict[Any, list], trail: list[tuple[Any, int, Any]], trail_mark: int):
+        # restores removals in reverse order so every domain gets back its original ordering
+        while len(trail) > trail_mark:
+            variable, index, value = trail.pop()
+            domains[variable].insert(index, value)
+            if self.variable_queue is not None:
+                self.variable_queue.update(variable, len(domains[variable]))
+
+    def try_portfolio(self, start_solution: list[CSP_Answer], configurations: list[CSP_Configuration],
+                      workers: Optional[int] = None) -> tuple[
+        list[list[CSP_Answer]], tuple, Optional[CSP_Configuration]]:
+        # runs configurations in separate processes, the first one to find a solution wins and the rest are killed
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        results = multiprocessing.Queue()
+        pending = list(enumerate(configurations))
+        running = dict()
+        total_solutions = list()
+        winner = None
+        nodes = 0
+        timer = time.time()
+        try:
+            while len(total_solutions) == 0 and (len(pending) > 0 or len(running) > 0):
+                while len(pending) > 0 and len(running) < workers:
+                    index, configuration = pending.pop(0)
+                    process = multiprocessing.Process(target=portfolio_worker,
+                                                      args=(self, start_solution, configuration, index, results),
+                                                      daemon=True)
+                    process.start()
+                    running[index] = process
+                try:
+                    index, solutions, nodes_entered = results.get(timeout=0.1)
+                except queue.Empty:
+                    # a worker that died without reporting back only frees its slot
+                    for index in [i for i, p in running.items() if not p.is_alive() and p.exitcode != 0]:
+                        running.pop(index).join()
+                    continue
+                running.pop(index).join()
+                if len(solutions) > 0:
+                    total_solutions = solutions
+                    winner = configurations[index]
+                    nodes = nodes_entered
+        finally:
+            for process in running.values():
+                process.terminate()
+                process.join()
+        end = time.time()
+        if winner is not None:
+            print(f"Portfolio: {winner} won. Nodes entered: {nodes}. Took {end - timer}")
+        else:
+            print(f"Portfolio: no solution. Took {end - timer}")
+        return total_solutions, (nodes, end - timer), winner
+
+    def split_configurations(self, start_solution: list[CSP_Answer], configuration: CSP_Configuration,
+                             k: int) -> list[CSP_Configuration]:
+        # one configuration per consistent assignment of the first k free variables (split search)
+        self.reset_assignment(start_solution)
+        variables = [v for v in self.variables if v not in self.assignment][:k]
+        prefixes = list()
+        self.collect_prefixes(variables, 0, list(), prefixes)
+        return [CSP_Configuration(configuration.method, configuration.heuristic, configuration.domain_heuristic,
+                                  configuration.seed, list(configuration.prefix) + prefix) for prefix in prefixes]
+
+    def collect_prefixes(self, variables: list, variable_index: int, prefix: list[CSP_Answer],
+                         prefixes: list[list[CSP_Answer]]):
+        if variable_index == len(variables):
+            prefixes.append(list(prefix))
+            return
+        for d in self.domain:
+            answer = CSP_Answer(variables[variable_index], d)
+            if self.goal_test(answer, self, self.assignment, self.additional_data):
+                self.assign(answer)
+                prefix.append(answer)
+                self.collect_prefixes(variables, variable_index + 1, prefix, prefixes)
+                prefix.pop()
+                self.unassign(answer)
+
+    def enable_statistics(self, on_statistics: Optional[Callable[[CSP_Statistics], None]] = None,
+                          trace_memory: bool = False):
+        # From now on every run fills a new self.statistics and passes it to on_statistics once it ends.
+        # The hot methods and callbacks are shadowed on this instance by their profiled_* wrappers,
+        # a solver that does not collect statistics runs the plain code without any checks.
+        # trace_memory measures the peak with tracemalloc, which slows the run down a lot.
+        if self.plain_callbacks is not None:
+            self.disable_statistics()
+        self.on_statistics = on_statistics
+        self.trace_memory = trace_memory
+        self.statistics = CSP_Statistics()
+        self.plain_callbacks = (self.goal_test, self.domain_mask, self.arc_test)
+        self.goal_test = self.profiled_goal_test
+        if self.domain_mask is not None:
+            self.domain_mask = self.profiled_domain_mask
+        if self.arc_test is not None:
+            self.arc_test = self.profiled_arc_test
+        for name in PROFILED_METHODS:
+            setattr(self, name, getattr(self, "profiled_" + name))
+
+    def disable_statistics(self):
+        if self.plain_callbacks is None:
+            return
+        self.goal_test, self.domain_mask, self.arc_test = self.plain_callbacks
+        self.plain_callbacks = None
+        for name in PROFILED_METHODS:
+            delattr(self, name)
+
+    def profiled_goal_test(self, answer: CSP_Answer, solver, answers: CSP_Assignment, additional_data) -> bool:
+        self.statistics.goal_tests += 1
+        timer = time.perf_counter()
+        result = self.plain_callbacks[0](answer, solver, answers, additional_data)
+        self.statistics.check_time += time.perf_counter() - timer
+        return result
+
+    def profiled_domain_mask(self, variable, solver, additional_data) -> int:
+        self.statistics.domain_masks += 1
+        timer = time.perf_counter()
+        result = self.plain_callbacks[1](variable, solver, additional_data)
+        self.statistics.check_time += time.perf_counter() - timer
+        return result
+
+    def profiled_arc_test(self, xi, vi, xj, vj, solver, additional_data) -> bool:
+        self.statistics.arc_tests += 1
+        timer = time.perf_counter()
+        result = self.plain_callbacks[2](xi, vi, xj, vj, solver, additional_data)
+        self.statistics.check_time += time.perf_counter() - timer
+        return result
+
+    def profiled_reset_assignment(self, start_solution: list[CSP_Answer]):
+        CSP_Solver.reset_assignment(self, start_solution)
+        self.statistics.clues = len(self.assignment)
+        self.statistics.max_depth = 0
+
+    def profiled_assign(self, answer: CSP_Answer):
+        CSP_Solver.assign(self, answer)
+        depth = len(self.assignment) - self.statistics.clues
+        if depth > self.statistics.max_depth:
+            self.statistics.max_depth = depth
+
+    def profiled_unassign(self, answer: CSP_Answer):
+        CSP_Solver.unassign(self, answer)
+        self.statistics.backtracks += 1
+
+    def profiled_prune_domains(self, variables: list, domains: dict[Any, list],
+                               trail: list[tuple[Any, int, Any]]) -> bool:
+        trail_mark = len(trail)
+        result = CSP_Solver.prune_domains(self, variables, domains, trail)
+        self.statistics.prunings += len(trail) - trail_mark
+        return result
+
+    def profiled_revise(self, xi, xj, domains: dict[Any, list], trail: list[tuple[Any, int, Any]]) -> bool:
+        trail_mark = len(trail)
+        result = CSP_Solver.revise(self, xi, xj, domains, trail)
+        self.statistics.prunings += len(trail) - trail_mark
+        return result
+
+    def profiled_search(self, start_solution: list[CSP_Answer], method: str, heuristic: str, domain_heuristic: str,
+                        number_of_enters: Optional[dict] = None, budget: Optional[CSP_Budget] = None,
+                        iterative: bool = False) -> Iterator[None]:
+        if number_of_enters is None:
+            number_of_enters = {"number": 0}
+        statistics = CSP_Statistics(method, heuristic, domain_heuristic)
+        self.statistics = statistics
+        run = CSP_Solver.search(self, start_solution, method, heuristic, domain_heuristic, number_of_enters, budget,
+                                iterative)
+        return self.profiled_run(run, statistics, number_of_enters)
+
+    def profiled_run(self, run: Iterator[None], statistics: CSP_Statistics,
+                     number_of_enters: dict) -> Iterator[None]:
+        nodes_mark = number_of_enters["number"]
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        timer = time.perf_counter()
+        try:
+            for _ in run:
+                statistics.solutions += 1
+                statistics.total_time += time.perf_counter() - timer
+                yield
+                timer = time.perf_counter()
+            statistics.total_time += time.perf_counter() - timer
+        finally:
+            # also reached when the caller stops early (limit of solutions, first solution only)
+            run.close()
+            statistics.nodes = number_of_enters["number"] - nodes_mark
+            if self.trace_memory:
+                statistics.peak_memory = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            if self.on_statistics is not None:
+                self.on_statistics(statistics)
+
+
+def portfolio_worker(solver: CSP_Solver, start_solution: list[CSP_Answer], configuration: CSP_Configuration,
+                     index: int, results):
+    if configuration.seed is not None:
+        random.seed(configuration.seed)
+    number_of_enters = {"number": 0}
+    solutions = list(solver.iter_solutions(start_solution + configuration.prefix, 1, configuration.method,
+                                           configuration.heuristic, configuration.domain_heuristic, number_of_enters))
+    results.put((index, solutions, number_of_enters["number"]))
+
+
+def default_portfolio(method: str = FORWARD_METHOD, seeds: int = 4) -> list[CSP_Configuration]:
+    configurations = [CSP_Configuration(method, SEQUENTIAL_HEURISTIC, SEQUENTIAL_HEURISTIC),
+                      CSP_Configuration(method, MRV_HEURISTIC, SEQUENTIAL_HEURISTIC),
+                      CSP_Configuration(method, MRV_HEURISTIC, LCV_HEURISTIC)]
+    for seed in range(seeds):
+        configurations.append(CSP_Configuration(method, RANDOM_HEURISTIC, RANDOM_HEURISTIC, seed))
+        configurations.append(CSP_Configuration(method, MRV_HEURISTIC, RANDOM_HEURISTIC, seed))
+    return configurations
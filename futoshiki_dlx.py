@@ -0,0 +1,279 @@
+import random
+import time
+from typing import Iterable, Iterator, Optional
+
+from csp import CSP_Answer, SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, MRV_HEURISTIC
+
+DLX_METHOD = "dlx"  # exact cover with dancing links, futoshiki only
+
+
+class FutoshikiDLX:
+    # Futoshiki as an exact cover problem solved with Algorithm X on dancing links.
+    # Options are (x, y, value), every option covers the columns cell (x, y), row y has value, column x has value.
+    # Inequalities are checked when an option is selected: options of partner cells that would break one are
+    # taken out of the matrix until the selection is undone, so column sizes count only consistent options.
+    # Links are kept in flat lists indexed by node: 0 is the root, 1..columns are the column headers.
+    def __init__(self, futoshiki):
+        self.futoshiki = futoshiki
+        n = futoshiki.n
+        self.n = n
+        column_count = 3 * n * n
+        self.left = list(range(-1, column_count))
+        self.right = list(range(1, column_count + 2))
+        self.left[0] = column_count
+        self.right[column_count] = 0
+        self.up = list(range(column_count + 1))
+        self.down = list(range(column_count + 1))
+        self.column = list(range(column_count + 1))
+        self.option_of = [-1] * (column_count + 1)
+        self.size = [0] * (column_count + 1)
+        self.options = list()  # option -> (x, y, value)
+        self.option_node = list()  # option -> its first node
+        self.dead = list()  # option -> how many covers / exclusions took it out of the matrix
+        self.option_index = dict()  # (x, y, value) -> option
+
+        lowest, highest = self.value_bounds()
+        for y in range(n):
+            for x in range(n):
+                for value in range(lowest[(x, y)], highest[(x, y)] + 1):
+                    self.add_option(x, y, value, [1 + y * n + x, 1 + n * n + y * n + value,
+                                                  1 + 2 * n * n + x * n + value])
+        # inequality partners of every cell, (other cell, cell has to be smaller)
+        self.partners = futoshiki.constraint_index
+
+    def value_bounds(self) -> tuple[dict, dict]:
+        # a cell below a chain of k bigger cells can hold at most n-1-k, and at least k above a chain of smaller ones
+        n = self.n
+        cells = [(x, y) for y in range(n) for x in range(n)]
+        index = self.futoshiki.constraint_index
+
+        def chain(cell, smaller: bool, lengths: dict) -> int:
+            if cell not in lengths:
+                lengths[cell] = 0
+                lengths[cell] = max([chain(o, smaller, lengths) + 1 for o, s in index[cell] if s == smaller],
+                                    default=0)
+            return lengths[cell]
+
+        above = dict()
+        below = dict()
+        return {c: chain(c, False, below) for c in cells}, {c: n - 1 - chain(c, True, above) for c in cells}
+
+    def add_option(self, x: int, y: int, value: int, columns: list[int]):
+        option = len(self.options)
+        self.options.append((x, y, value))
+        self.option_index[(x, y, value)] = option
+        self.dead.append(0)
+        first = len(self.column)
+        self.option_node.append(first)
+        for i, c in enumerate(columns):
+            node = first + i
+            self.column.append(c)
+            self.option_of.append(option)
+            self.left.append(first + (i - 1) % len(columns))
+            self.right.append(first + (i + 1) % len(columns))
+            self.up.append(self.up[c])
+            self.down.append(c)
+            self.down[self.up[c]] = node
+            self.up[c] = node
+            self.size[c] += 1
+
+    def cover(self, c: int):
+        self.right[self.left[c]] = self.right[c]
+        self.left[self.right[c]] = self.left[c]
+        i = self.down[c]
+        while i != c:
+            self.dead[self.option_of[i]] += 1
+            j = self.right[i]
+            while j != i:
+                self.up[self.down[j]] = self.up[j]
+                self.down[self.up[j]] = self.down[j]
+                self.size[self.column[j]] -= 1
+                j = self.right[j]
+            i = self.down[i]
+
+    def uncover(self, c: int):
+        i = self.up[c]
+        while i != c:
+            j = self.left[i]
+            while j != i:
+                self.size[self.column[j]] += 1
+                self.up[self.down[j]] = j
+                self.down[self.up[j]] = j
+                j = self.left[j]
+            self.dead[self.option_of[i]] -= 1
+            i = self.up[i]
+        self.right[self.left[c]] = c
+        self.left[self.right[c]] = c
+
+    def exclude(self, option: int):
+        # takes a live option out of all of its columns
+        first = self.option_node[option]
+        j = first
+        while True:
+            self.up[self.down[j]] = self.up[j]
+            self.down[self.up[j]] = self.down[j]
+            self.size[self.column[j]] -= 1
+            j = self.right[j]
+            if j == first:
+                break
+        self.dead[option] += 1
+
+    def include(self, option: int):
+        first = self.option_node[option]
+        j = self.left[first]
+        while True:
+            self.size[self.column[j]] += 1
+            self.up[self.down[j]] = j
+            self.down[self.up[j]] = j
+            if j == first:
+                break
+            j = self.left[j]
+        self.dead[option] -= 1
+
+    def select(self, node: int) -> list[int]:
+        # covers the other columns of the node's option (its own column is covered already), then excludes
+        # partner options breaking an inequality with it
+        j = self.right[node]
+        while j != node:
+            self.cover(self.column[j])
+            j = self.right[j]
+        option = self.option_of[node]
+        x, y, value = self.options[option]
+        excluded = list()
+        for (px, py), is_smaller in self.partners[(x, y)]:
+            wrong = range(0, value + 1) if is_smaller else range(value, self.n)
+            for other_value in wrong:
+                other = self.option_index.get((px, py, other_value))
+                if other is not None and self.dead[other] == 0:
+                    self.exclude(other)
+                    excluded.append(other)
+        return excluded
+
+    def deselect(self, node: int, excluded: list[int]):
+        for other in reversed(excluded):
+            self.include(other)
+        j = self.left[node]
+        while j != node:
+            self.uncover(self.column[j])
+            j = self.left[j]
+
+    def choose_column(self, heuristic: str) -> int:
+        if heuristic == SEQUENTIAL_HEURISTIC:
+            return self.right[0]
+        if heuristic == RANDOM_HEURISTIC:
+            columns = list()
+            c = self.right[0]
+            while c != 0:
+                columns.append(c)
+                c = self.right[c]
+            return random.choice(columns)
+        # MRV - fewest options left (Knuth's S heuristic)
+        best = self.right[0]
+        c = self.right[best]
+        while c != 0 and self.size[best] > 1:
+            if self.size[c] < self.size[best]:
+                best = c
+            c = self.right[c]
+        return best
+
+    def start(self, solution: list[int], selected: list[tuple[int, list[int]]], removed: list[int],
+              clues: Optional[list[CSP_Answer]] = None, excluded: Iterable[CSP_Answer] = ()) -> bool:
+        # selects the clues (the puzzle's own unless given), False when they contradict each other, and takes
+        # the excluded answers out of the matrix; finish takes back what was selected and removed
+        if clues is None:
+            clues = self.futoshiki.loaded_numbers
+        for answer in clues:
+            x, y = answer.variable_position
+            option = self.option_index.get((x, y, answer.answer_domain))
+            if option is None or self.dead[option] != 0:
+                return False
+            node = self.option_node[option]
+            self.cover(self.column[node])
+            selected.append((node, self.select(node)))
+            solution.append(option)
+        for answer in excluded:
+            option = self.option_index.get((*answer.variable_position, answer.answer_domain))
+            if option is not None and self.dead[option] == 0:
+                self.exclude(option)
+                removed.append(option)
+        return True
+
+    def finish(self, selected: list[tuple[int, list[int]]], removed: list[int]):
+        for option in reversed(removed):
+            self.include(option)
+        for node, excluded in reversed(selected):
+            self.deselect(node, excluded)
+            self.uncover(self.column[node])
+
+    def dlx_recurrence(self, solution: list[int], number_of_enters: dict, heuristic: str,
+                       domain_heuristic: str) -> Iterator[None]:
+        number_of_enters["number"] += 1
+        if self.right[0] == 0:
+            yield
+            return
+        c = self.choose_column(heuristic)
+        if self.size[c] == 0:
+            return
+        self.cover(c)
+        rows = list()
+        i = self.down[c]
+        while i != c:
+            rows.append(i)
+            i = self.down[i]
+        if domain_heuristic == RANDOM_HEURISTIC:
+            random.shuffle(rows)
+        # the links are restored also when the search is abandoned at a solution, so the matrix can be reused
+        try:
+            for i in rows:
+                excluded = self.select(i)
+                solution.append(self.option_of[i])
+                try:
+                    yield from self.dlx_recurrence(solution, number_of_enters, heuristic, domain_heuristic)
+                finally:
+                    solution.pop()
+                    self.deselect(i, excluded)
+        finally:
+            self.uncover(c)
+
+    def search(self, limit: Optional[int], heuristic: str, domain_heuristic: str, number_of_enters: dict,
+               clues: Optional[list[CSP_Answer]] = None, excluded: Iterable[CSP_Answer] = ()) -> Iterator[list[int]]:
+        # options of every solution; one search at a time, it changes the matrix in place until it ends
+        if limit is not None and limit <= 0:
+            return
+        solution = list()
+        selected = list()
+        removed = list()
+        try:
+            if not self.start(solution, selected, removed, clues, excluded):
+                return
+            found = 0
+            for _ in self.dlx_recurrence(solution, number_of_enters, heuristic, domain_heuristic):
+                yield solution
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+        finally:
+            self.finish(selected, removed)
+
+    def iter_solutions(self, limit: Optional[int] = None, heuristic: str = MRV_HEURISTIC,
+                       domain_heuristic: str = SEQUENTIAL_HEURISTIC,
+                       number_of_enters: Optional[dict] = None) -> Iterator[list[CSP_Answer]]:
+        if number_of_enters is None:
+            number_of_enters = {"number": 0}
+        for solution in self.search(limit, heuristic, domain_heuristic, number_of_enters):
+            yield [CSP_Answer((x, y), value) for x, y, value in (self.options[o] for o in solution)]
+
+    def count_solutions(self, limit: Optional[int] = None, heuristic: str = MRV_HEURISTIC,
+                        domain_heuristic: str = SEQUENTIAL_HEURISTIC, clues: Optional[list[CSP_Answer]] = None,
+                        excluded: Iterable[CSP_Answer] = ()) -> int:
+        return sum(1 for _ in self.search(limit, heuristic, domain_heuristic, {"number": 0}, clues, excluded))
+
+    def try_solve(self, heuristic: str = MRV_HEURISTIC, domain_heuristic: str = SEQUENTIAL_HEURISTIC):
+        number_of_enters = {"number": 0}
+        timer = time.time()
+        total_solutions = list(self.iter_solutions(1, heuristic, domain_heuristic, number_of_enters))
+        end = time.time()
+        if len(total_solutions) > 0:
+            print("Found one solution!")
+        print(f"DLX: Total nodes entered: {number_of_enters['number']}. Took {end - timer}")
+        return total_solutions, (number_of_enters['number'], end - timer)
@@ -1,47 +1,80 @@
+from typing import Iterable
+
+import numpy as np
 from tabulate import tabulate
 
-from csp import CSP_Answer, CSP_Solver, SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC
-from utils import get_answer_in_pos, null_answer
+from csp import CSP_Answer, CSP_Assignment, CSP_Solver, EMPTY_CELL, SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, \
+    MRV_HEURISTIC, LCV_HEURISTIC, FORWARD_METHOD, default_portfolio
+from futoshiki_dlx import FutoshikiDLX
+from utils import generate_line_neighbours
 
 
-def futoshiki_tester(answer: CSP_Answer, solver: CSP_Solver, answers: list[CSP_Answer], futoshiki):
+def futoshiki_domain_mask(variable, solver: CSP_Solver, futoshiki) -> int:
     futoshiki: Futoshiki
-    # condition one - constrains
+    x_pos, y_pos = variable
+    # condition two - columns and rows
+    mask = futoshiki.full_mask & ~(futoshiki.row_used[y_pos] | futoshiki.column_used[x_pos])
 
-    for con in futoshiki.bigger_constraint:
-        if con.smaller_pos == answer.variable_position:
-            second = get_answer_in_pos(con.bigger_pos[0], con.bigger_pos[1], answers)
-            answer_smaller = True
-        elif con.bigger_pos == answer.variable_position:
-            second = get_answer_in_pos(con.smaller_pos[0], con.smaller_pos[1], answers)
-            answer_smaller = False
-        else:
+    # condition one - constrains
+    for other, is_smaller in futoshiki.constraint_index[variable]:
+        second = solver.assignment.get_answer(other)
+        if second is None:
             continue
+        if is_smaller:
+            mask &= (1 << second.answer_domain) - 1
+        else:
+            mask &= ~((2 << second.answer_domain) - 1)
+    return mask
 
-        if second == null_answer:
-            continue
-        if answer_smaller and second.answer_domain <= answer.answer_domain:
-            return False
-        elif not answer_smaller and answer.answer_domain <= second.answer_domain:
-            return False
 
-    # condition two - columns and rows
-    table = futoshiki.get_futoshiki_table(answers + [answer], empty_string="x")
+def futoshiki_tester(answer: CSP_Answer, solver: CSP_Solver, answers: CSP_Assignment, futoshiki):
+    return futoshiki_domain_mask(answer.variable_position, solver, futoshiki) >> answer.answer_domain & 1 == 1
 
-    row = list(filter(lambda d: d != "x", table[answer.variable_position[1]]))
 
-    # print(row)
-    if len(set(row)) != len(row):
-        return False
+def futoshiki_conflicts(answer: CSP_Answer, solver: CSP_Solver, futoshiki):
+    # assigned cells of the row and column that already hold the value or whose inequality it breaks
+    futoshiki: Futoshiki
+    culprits = list()
+    for other in futoshiki.neighbours[answer.variable_position]:
+        second = solver.assignment.get_answer(other)
+        if second is not None and not futoshiki_arc_test(answer.variable_position, answer.answer_domain, other,
+                                                        second.answer_domain, solver, futoshiki):
+            culprits.append(other)
+    return culprits
 
-    column = list(filter(lambda d: d != "x", [x[answer.variable_position[0]] for x in table]))
-    # print(column)
-    if len(set(column)) != len(column):
+
+def futoshiki_neighbours(variable, solver: CSP_Solver, futoshiki):
+    return futoshiki.neighbours[variable]
+
+
+def futoshiki_arc_test(xi, vi, xj, vj, solver: CSP_Solver, futoshiki) -> bool:
+    futoshiki: Futoshiki
+    if vi == vj:
         return False
+    is_smaller = futoshiki.inequalities.get((xi, xj))
+    if is_smaller is None:
+        return True
+    return vi < vj if is_smaller else vi > vj
+
+
+def futoshiki_reset(solver: CSP_Solver, futoshiki):
+    futoshiki: Futoshiki
+    futoshiki.row_used = [0] * futoshiki.n
+    futoshiki.column_used = [0] * futoshiki.n
+
+
+def futoshiki_assign(answer: CSP_Answer, solver: CSP_Solver, futoshiki):
+    futoshiki: Futoshiki
+    bit = 1 << answer.answer_domain
+    futoshiki.row_used[answer.variable_position[1]] |= bit
+    futoshiki.column_used[answer.variable_position[0]] |= bit
 
-    return True
 
-    # Codition one - CHECK FOR Unique colums?
+def futoshiki_unassign(answer: CSP_Answer, solver: CSP_Solver, futoshiki):
+    futoshiki: Futoshiki
+    bit = 1 << answer.answer_domain
+    futoshiki.row_used[answer.variable_position[1]] &= ~bit
+    futoshiki.column_used[answer.variable_position[0]] &= ~bit
 
 
 class FutoshikiConstraint:
@@ -55,21 +88,42 @@ class FutoshikiConstraint:
 
 
 class Futoshiki:
+    # values are kept as bitmasks, bit v set <=> value v
+    row_used: list[int]
+    column_used: list[int]
+    constraint_index: dict[tuple, list[tuple[tuple, bool]]]  # cell -> (other cell, cell has to be smaller)
+    # unsolved cell -> unsolved cells in the same row or column, inequality partners are always among them
+    neighbours: dict[tuple, list[tuple]]
+    inequalities: dict[tuple[tuple, tuple], bool]  # (cell, other cell) -> cell has to be smaller
 
     def generate_unsolved_positions(self):
-        l = list()
-        arra = self.get_futoshiki_table(empty_string=".")
-        for y in range(len(arra)):
-            for x in range(len(arra[y])):
-                if arra[y][x] == ".":
-                    l.append((x, y))
-        return l
+        return [(int(x), int(y)) for y, x in np.argwhere(self.get_futoshiki_board() == EMPTY_CELL)]
 
     def __init__(self, n: int, loaded_numbers: list[CSP_Answer], bigger_constraint: list[FutoshikiConstraint]):
         self.n = n
         self.loaded_numbers = loaded_numbers
         self.bigger_constraint = bigger_constraint
-        self.solver = CSP_Solver([x for x in range(n)], futoshiki_tester, self, self.generate_unsolved_positions())
+        self.full_mask = (1 << n) - 1
+        self.constraint_index = self.generate_constraint_index()
+        unsolved = self.generate_unsolved_positions()
+        self.neighbours = generate_line_neighbours(unsolved)
+        self.inequalities = {(p, o): s for p, others in self.constraint_index.items() for o, s in others}
+        # every pair in a row or column is a binary constraint (different values, plus the inequality if there is one)
+        self.solver = CSP_Solver([x for x in range(n)], futoshiki_tester, self, unsolved, futoshiki_reset,
+                                 futoshiki_assign, futoshiki_unassign, futoshiki_domain_mask, futoshiki_neighbours,
+                                 futoshiki_neighbours, futoshiki_arc_test, futoshiki_conflicts)
+        # (y, x) index arrays of the smaller and bigger cell of every inequality, for checks on a whole board
+        self.smaller_cells = tuple(np.array([[c.smaller_pos[1], c.smaller_pos[0]] for c in bigger_constraint],
+                                            dtype=np.intp).reshape(-1, 2).T)
+        self.bigger_cells = tuple(np.array([[c.bigger_pos[1], c.bigger_pos[0]] for c in bigger_constraint],
+                                           dtype=np.intp).reshape(-1, 2).T)
+
+    def generate_constraint_index(self):
+        index = {(x, y): list() for y in range(self.n) for x in range(self.n)}
+        for con in self.bigger_constraint:
+            index[con.smaller_pos].append((con.bigger_pos, True))
+            index[con.bigger_pos].append((con.smaller_pos, False))
+        return index
 
     def try_solve_backtracking(self, heuristic, domain_heuristic):
         return self.solver.try_backtrack(self.loaded_numbers, heuristic, domain_heuristic)
@@ -77,8 +131,51 @@ class Futoshiki:
     def try_solve_forward(self, heuristic, domain_heuristic):
         return self.solver.try_forward(self.loaded_numbers, heuristic, domain_heuristic)
 
-    def get_futoshiki_table(self, answers: list[CSP_Answer] = None, add_equals: bool = False, empty_string: str = " ",
-                            display_format=False):
+    def try_solve_mac(self, heuristic, domain_heuristic):
+        return self.solver.try_mac(self.loaded_numbers, heuristic, domain_heuristic)
+
+    def try_solve_backjumping(self, heuristic, domain_heuristic):
+        return self.solver.try_backjump(self.loaded_numbers, heuristic, domain_heuristic)
+
+    def try_solve_dlx(self, heuristic, domain_heuristic):
+        return FutoshikiDLX(self).try_solve(heuristic, domain_heuristic)
+
+    def iter_solutions(self, limit=None, method=FORWARD_METHOD, heuristic=SEQUENTIAL_HEURISTIC,
+                       domain_heuristic=SEQUENTIAL_HEURISTIC):
+        return self.solver.iter_solutions(self.loaded_numbers, limit, method, heuristic, domain_heuristic)
+
+    def count_solutions(self, limit=None, method=FORWARD_METHOD, heuristic=SEQUENTIAL_HEURISTIC,
+                        domain_heuristic=SEQUENTIAL_HEURISTIC):
+        return self.solver.count_solutions(self.loaded_numbers, limit, method, heuristic, domain_heuristic)
+
+    def solve(self, limit=1, method=FORWARD_METHOD, heuristic=SEQUENTIAL_HEURISTIC,
+              domain_heuristic=SEQUENTIAL_HEURISTIC, budget=None):
+        return self.solver.solve(self.loaded_numbers, method, heuristic, domain_heuristic, limit, budget)
+
+    def try_solve_portfolio(self, configurations=None, workers=None):
+        if configurations is None:
+            configurations = default_portfolio()
+        return self.solver.try_portfolio(self.loaded_numbers, configurations, workers)
+
+    def get_futoshiki_board(self, answers: Iterable[CSP_Answer] = None) -> np.ndarray:
+        if answers is None:
+            answers = self.loaded_numbers
+        board = np.full((self.n, self.n), EMPTY_CELL, dtype=np.int8)
+        for e in answers:
+            board[e.variable_position[1], e.variable_position[0]] = e.answer_domain
+        return board
+
+    def is_solution(self, answers: Iterable[CSP_Answer]) -> bool:
+        # whole board check, all rows/columns and all inequalities at once
+        board = self.get_futoshiki_board(answers)
+        clues = self.get_futoshiki_board()
+        values = np.arange(self.n)
+        return bool((np.sort(board, axis=1) == values).all() and (np.sort(board.T, axis=1) == values).all()
+                    and (board[self.smaller_cells] < board[self.bigger_cells]).all()
+                    and (board[clues != EMPTY_CELL] == clues[clues != EMPTY_CELL]).all())
+
+    def get_futoshiki_table(self, answers: Iterable[CSP_Answer] = None, add_equals: bool = False,
+                            empty_string: str = " ", display_format=False):
         if answers is None:
             answers = self.loaded_numbers
         l = list()
@@ -105,56 +202,90 @@ class Futoshiki:
         return l
 
 
-def load_futoshiki(file_name):
-    answers = []
-    constraints = []
-    with open(file_name, "r", encoding="utf-8") as file:
-        y = 0
-        for l in file.readlines():
-            l = l.strip()
-            if "x" in l:
-                x = 0
-                for c in l:
-                    if c == "x":
-                        x += 1
-                    elif c == ">":
-                        constraints.append(FutoshikiConstraint((x, y), (x - 1, y)))
-                    elif c == "<":
-                        constraints.append(FutoshikiConstraint((x - 1, y), (x, y)))
-                    elif c == "-":
-                        continue
-                    else:
-                        answers.append(CSP_Answer((x, y), int(c) - 1))
-                        x += 1
-                y += 1
+# byte -> cell value (0 based), x is an empty cell
+FUTOSHIKI_CELLS = np.full(256, EMPTY_CELL, dtype=np.int8)
+FUTOSHIKI_CELLS[ord("1"):ord("9") + 1] = np.arange(9)
+# byte -> relation between a cell and the next one (right or below): 1 first is smaller, -1 first is bigger
+FUTOSHIKI_RELATIONS = np.zeros(256, dtype=np.int8)
+FUTOSHIKI_RELATIONS[ord("<")] = 1
+FUTOSHIKI_RELATIONS[ord(">")] = -1
+# cell value + 1 and relation + 1 -> byte, the other way round
+FUTOSHIKI_SYMBOLS = np.frombuffer(b"x123456789", dtype=np.uint8)
+FUTOSHIKI_RELATION_SYMBOLS = np.frombuffer(b">-<", dtype=np.uint8)
+
+
+def parse_futoshiki_board(lines: list[bytes]) -> np.ndarray:
+    # lines of one puzzle in the text format, without line endings
+    # -> int8 planes (3, n, n): values, relation to the right neighbour, relation to the cell below
+    n = len(lines[0]) // 2 + 1
+    assert len(lines) == 2 * n - 1
+    value_lines = np.frombuffer(b"".join(lines[0::2]), dtype=np.uint8).reshape(n, 2 * n - 1)
+    planes = np.zeros((3, n, n), dtype=np.int8)
+    planes[0] = FUTOSHIKI_CELLS[value_lines[:, 0::2]]
+    planes[1, :, :-1] = FUTOSHIKI_RELATIONS[value_lines[:, 1::2]]
+    if n > 1:
+        planes[2, :-1] = FUTOSHIKI_RELATIONS[np.frombuffer(b"".join(lines[1::2]), dtype=np.uint8).reshape(n - 1, n)]
+    return planes
+
+
+def format_futoshiki_board(planes: np.ndarray) -> list[bytes]:
+    # the text format lines of planes (3, n, n), parse_futoshiki_board reads them back; values only up to 9
+    n = planes.shape[1]
+    if n > len(FUTOSHIKI_SYMBOLS) - 1:
+        raise ValueError(f"The text format holds futoshiki boards up to 9x9, not {n}x{n}")
+    lines = list()
+    for y in range(n):
+        line = np.empty(2 * n - 1, dtype=np.uint8)
+        line[0::2] = FUTOSHIKI_SYMBOLS[planes[0, y].astype(np.intp) + 1]
+        line[1::2] = FUTOSHIKI_RELATION_SYMBOLS[planes[1, y, :-1].astype(np.intp) + 1]
+        lines.append(line.tobytes())
+        if y < n - 1:
+            lines.append(FUTOSHIKI_RELATION_SYMBOLS[planes[2, y].astype(np.intp) + 1].tobytes())
+    return lines
+
+
+def futoshiki_to_board(futoshiki: Futoshiki) -> np.ndarray:
+    # the inverse of futoshiki_from_board
+    planes = np.zeros((3, futoshiki.n, futoshiki.n), dtype=np.int8)
+    planes[0] = futoshiki.get_futoshiki_board()
+    for constraint in futoshiki.bigger_constraint:
+        # relations are stored at the left / upper cell of the pair
+        first, second = sorted([constraint.smaller_pos, constraint.bigger_pos], key=lambda p: (p[1], p[0]))
+        plane = 1 if first[1] == second[1] else 2
+        planes[plane, first[1], first[0]] = 1 if first == constraint.smaller_pos else -1
+    return planes
+
+
+def futoshiki_from_board(planes: np.ndarray) -> Futoshiki:
+    answers = [CSP_Answer((int(x), int(y)), int(planes[0, y, x])) for y, x in np.argwhere(planes[0] != EMPTY_CELL)]
+    constraints = list()
+    for plane, (dx, dy) in [(1, (1, 0)), (2, (0, 1))]:
+        for y, x in np.argwhere(planes[plane] != 0):
+            first, second = (int(x), int(y)), (int(x) + dx, int(y) + dy)
+            if planes[plane, y, x] == 1:
+                constraints.append(FutoshikiConstraint(first, second))
             else:
-                x = 0
-                for c in l:
-                    if c == "-":
-                        x += 1
-                    elif c == ">":
-                        constraints.append(FutoshikiConstraint((x, y), (x, y - 1)))
-                        x += 1
-                    elif c == "<":
-                        constraints.append(FutoshikiConstraint((x, y - 1), (x, y)))
-                        x += 1
-                    else:
-                        assert False
-    # print(x)
-    # print(y)
-    return Futoshiki(y, answers, constraints)
+                constraints.append(FutoshikiConstraint(second, first))
+    return Futoshiki(planes.shape[1], answers, constraints)
+
+
+def load_futoshiki(file_name):
+    with open(file_name, "rb") as file:
+        lines = [l.strip() for l in file]
+    return futoshiki_from_board(parse_futoshiki_board([l for l in lines if l]))
 
 
 def solve_futoshiki_backtrack(file_name, print_solutions=False, heuristic=SEQUENTIAL_HEURISTIC,
                               domain_heuristic=SEQUENTIAL_HEURISTIC):
     print(
-        f"Trying futoshiki Backtracking with Heuristic: {'sequential' if heuristic == SEQUENTIAL_HEURISTIC else 'randomised'} and domain {domain_heuristic}")
+        f"Trying futoshiki Backtracking with Heuristic: {heuristic.lower()} and domain {domain_heuristic}")
     futoshiki = load_futoshiki(file_name)
     # print(tabulate(futoshiki.get_futoshiki_table(None, True, "x")))
     # for c in futoshiki.bigger_constraint:
     #     print(c)
     sol, tup = futoshiki.try_solve_backtracking(heuristic, domain_heuristic)
     print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(futoshiki.is_solution(e) for e in sol)
     if print_solutions:
         i = 1
         for e in sol:
@@ -167,10 +298,62 @@ def solve_futoshiki_backtrack(file_name, print_solutions=False, heuristic=SEQUEN
 def solve_futoshiki_forward(file_name, print_solutions=False, heuristic=SEQUENTIAL_HEURISTIC,
                             domain_heuristic=SEQUENTIAL_HEURISTIC):
     print(
-        f"Trying futoshiki Forward Checking with Heuristic: {'sequential' if heuristic == SEQUENTIAL_HEURISTIC else 'randomised'} and doamin {domain_heuristic}")
+        f"Trying futoshiki Forward Checking with Heuristic: {heuristic.lower()} and doamin {domain_heuristic}")
     futoshiki = load_futoshiki(file_name)
     sol, tup = futoshiki.try_solve_forward(heuristic, domain_heuristic)
     print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(futoshiki.is_solution(e) for e in sol)
+    if print_solutions:
+        i = 1
+        for e in sol:
+            print(f"SOLUTION {i}")
+            print(tabulate(futoshiki.get_futoshiki_table(e, True, "ERROR", display_format=True)))
+            i += 1
+    return tup
+
+
+def solve_futoshiki_mac(file_name, print_solutions=False, heuristic=SEQUENTIAL_HEURISTIC,
+                        domain_heuristic=SEQUENTIAL_HEURISTIC):
+    print(
+        f"Trying futoshiki MAC with Heuristic: {heuristic.lower()} and domain {domain_heuristic}")
+    futoshiki = load_futoshiki(file_name)
+    sol, tup = futoshiki.try_solve_mac(heuristic, domain_heuristic)
+    print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(futoshiki.is_solution(e) for e in sol)
+    if print_solutions:
+        i = 1
+        for e in sol:
+            print(f"SOLUTION {i}")
+            print(tabulate(futoshiki.get_futoshiki_table(e, True, "ERROR", display_format=True)))
+            i += 1
+    return tup
+
+
+def solve_futoshiki_backjump(file_name, print_solutions=False, heuristic=SEQUENTIAL_HEURISTIC,
+                             domain_heuristic=SEQUENTIAL_HEURISTIC):
+    print(
+        f"Trying futoshiki Backjumping with Heuristic: {heuristic.lower()} and domain {domain_heuristic}")
+    futoshiki = load_futoshiki(file_name)
+    sol, tup = futoshiki.try_solve_backjumping(heuristic, domain_heuristic)
+    print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(futoshiki.is_solution(e) for e in sol)
+    if print_solutions:
+        i = 1
+        for e in sol:
+            print(f"SOLUTION {i}")
+            print(tabulate(futoshiki.get_futoshiki_table(e, True, "ERROR", display_format=True)))
+            i += 1
+    return tup
+
+
+def solve_futoshiki_dlx(file_name, print_solutions=False, heuristic=MRV_HEURISTIC,
+                        domain_heuristic=SEQUENTIAL_HEURISTIC):
+    print(
+        f"Trying futoshiki DLX with Heuristic: {heuristic.lower()} and domain {domain_heuristic}")
+    futoshiki = load_futoshiki(file_name)
+    sol, tup = futoshiki.try_solve_dlx(heuristic, domain_heuristic)
+    print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(futoshiki.is_solution(e) for e in sol)
     if print_solutions:
         i = 1
         for e in sol:
@@ -181,29 +364,31 @@ def solve_futoshiki_forward(file_name, print_solutions=False, heuristic=SEQUENTI
 
 
 if __name__ == '__main__':
-    solve_futoshiki_backtrack("dane\\futoshiki", True, SEQUENTIAL_HEURISTIC, SEQUENTIAL_HEURISTIC)
+    solve_futoshiki_backtrack("dane/futoshiki", True, SEQUENTIAL_HEURISTIC, SEQUENTIAL_HEURISTIC)
     exit()
     with open("futoshiki_results3.txt", "w", encoding="utf-8") as output:
         output.write("input;method;heuristic;domain_heuristic;nodes;time\n")
-        for heuristic in [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC]:
-            for domain_heuristic in [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC]:
-                for input_file in ["dane\\futoshiki_4x4", "dane\\futoshiki_5x5", "dane\\futoshiki_6x6"]:
+        for heuristic in [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, MRV_HEURISTIC]:
+            for domain_heuristic in [SEQUENTIAL_HEURISTIC, RANDOM_HEURISTIC, LCV_HEURISTIC]:
+                for input_file in ["dane/futoshiki_4x4", "dane/futoshiki_5x5", "dane/futoshiki_6x6"]:
                     sol = solve_futoshiki_backtrack(input_file, False, heuristic, domain_heuristic)
                     output.write(f"{input_file};backtracking;{heuristic};{domain_heuristic};{sol[0]};{sol[1]}\n")
                     sol = solve_futoshiki_forward(input_file, False, heuristic, domain_heuristic)
                     output.write(f"{input_file};forward;{heuristic};{domain_heuristic};{sol[0]};{sol[1]}\n")
+                    sol = solve_futoshiki_mac(input_file, False, heuristic, domain_heuristic)
+                    output.write(f"{input_file};mac;{heuristic};{domain_heuristic};{sol[0]};{sol[1]}\n")
     exit()
 
-    solve_futoshiki_forward("dane\\futoshiki_4x4", True, SEQUENTIAL_HEURISTIC)
-    solve_futoshiki_forward("dane\\futoshiki_4x4", False, SEQUENTIAL_HEURISTIC)
-    solve_futoshiki_forward("dane\\futoshiki_4x4", False, RANDOM_HEURISTIC)
-    solve_futoshiki_backtrack("dane\\futoshiki_4x4", False, SEQUENTIAL_HEURISTIC)
-    solve_futoshiki_backtrack("dane\\futoshiki_4x4", False, RANDOM_HEURISTIC)
+    solve_futoshiki_forward("dane/futoshiki_4x4", True, SEQUENTIAL_HEURISTIC)
+    solve_futoshiki_forward("dane/futoshiki_4x4", False, SEQUENTIAL_HEURISTIC)
+    solve_futoshiki_forward("dane/futoshiki_4x4", False, RANDOM_HEURISTIC)
+    solve_futoshiki_backtrack("dane/futoshiki_4x4", False, SEQUENTIAL_HEURISTIC)
+    solve_futoshiki_backtrack("dane/futoshiki_4x4", False, RANDOM_HEURISTIC)
     exit(0)
-    solve_futoshiki_forward("dane\\futoshiki_5x5", False)
-    solve_futoshiki_forward("dane\\futoshiki_6x6", False)
+    solve_futoshiki_forward("dane/futoshiki_5x5", False)
+    solve_futoshiki_forward("dane/futoshiki_6x6", False)
 
-    solve_futoshiki_backtrack("dane\\futoshiki_4x4", True)
-    solve_futoshiki_backtrack("dane\\futoshiki_5x5", False)
-    solve_futoshiki_backtrack("dane\\futoshiki_6x6", False)
-    # print(tabulate(load_futoshiki("dane\\futoshiki_4x4").get_futoshiki_table(add_equals=True, empty_string="x")))
+    solve_futoshiki_backtrack("dane/futoshiki_4x4", True)
+    solve_futoshiki_backtrack("dane/futoshiki_5x5", False)
+    solve_futoshiki_backtrack("dane/futoshiki_6x6", False)
+    # print(tabulate(load_futoshiki("dane/futoshiki_4x4").get_futoshiki_table(add_equals=True, empty_string="x")))
@@ -0,0 +1,150 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from binary_lines import BinaryLineSolver
+from binary_puzzle import BinaryPuzzle, format_binary_board
+from corpus import BINARY_PUZZLE, FUTOSHIKI_PUZZLE
+from csp import CSP_Answer, MRV_HEURISTIC, RANDOM_HEURISTIC
+from futoshiki_dlx import FutoshikiDLX
+from futoshiki_puzzle import Futoshiki, FutoshikiConstraint, FUTOSHIKI_SYMBOLS, format_futoshiki_board, \
+    futoshiki_to_board
+
+GENERATOR_CLUE_DENSITY = 0.0  # as few clues as uniqueness allows
+GENERATOR_INEQUALITY_DENSITY = 0.3
+
+
+def solution_counter(puzzle):
+    # the fastest counting solver of each type, line patterns for binary puzzles, dancing links for futoshiki
+    if isinstance(puzzle, BinaryPuzzle):
+        return BinaryLineSolver(puzzle)
+    return FutoshikiDLX(puzzle)
+
+
+def random_solution(puzzle_type: str, size_x: int, size_y: int) -> list[CSP_Answer]:
+    # a full board, randomised through the value order of the (seeded) search of a blank puzzle
+    if puzzle_type == BINARY_PUZZLE:
+        if size_x % 2 or size_y % 2:
+            raise ValueError(f"A binary puzzle needs even sizes, not {size_x}x{size_y}")
+        return next(BinaryLineSolver(BinaryPuzzle(size_x, size_y, [])).iter_solutions(1, MRV_HEURISTIC,
+                                                                                      RANDOM_HEURISTIC))
+    return next(FutoshikiDLX(Futoshiki(size_x, [], [])).iter_solutions(1, MRV_HEURISTIC, RANDOM_HEURISTIC))
+
+
+def random_inequalities(solution: list[CSP_Answer], density: float, rng: random.Random) -> list[FutoshikiConstraint]:
+    values = {a.variable_position: a.answer_domain for a in solution}
+    constraints = list()
+    for (x, y), value in sorted(values.items()):
+        for other in [(x + 1, y), (x, y + 1)]:
+            if other in values and rng.random() < density:
+                if value < values[other]:
+                    constraints.append(FutoshikiConstraint((x, y), other))
+                else:
+                    constraints.append(FutoshikiConstraint(other, (x, y)))
+    return constraints
+
+
+def generate_puzzle(puzzle_type: str, size: int, seed: int, clue_density: float = GENERATOR_CLUE_DENSITY,
+                    inequality_density: float = GENERATOR_INEQUALITY_DENSITY, height: Optional[int] = None):
+    # a random full solution, then clues are taken away in random order as long as the solution stays unique
+    # (until only clue_density of the cells are left); futoshiki keeps inequality_density of its inequalities
+    random.seed(seed)
+    rng = random.Random(seed)
+    size_y = size if height is None or puzzle_type == FUTOSHIKI_PUZZLE else height
+    solution = random_solution(puzzle_type, size, size_y)
+    # one counter over the clue-less puzzle for all the counts, the clues left are handed to every count
+    if puzzle_type == BINARY_PUZZLE:
+        counter = solution_counter(BinaryPuzzle(size, size_y, []))
+    else:
+        counter = solution_counter(Futoshiki(size, [], random_inequalities(solution, inequality_density, rng)))
+    order = list(range(len(solution)))
+    rng.shuffle(order)
+    kept = [True] * len(solution)
+    left = len(solution)
+    target = round(clue_density * len(solution))
+    for index in order:
+        if left <= target:
+            break
+        kept[index] = False
+        # the clues left were unique, so they stay unique unless a solution holds another value at the cell
+        if counter.count_solutions(1, clues=[a for a, k in zip(solution, kept) if k], excluded=[solution[index]]) == 0:
+            left -= 1
+        else:
+            kept[index] = True
+    clues = [a for a, k in zip(solution, kept) if k]
+    if puzzle_type == BINARY_PUZZLE:
+        return BinaryPuzzle(size, size_y, clues)
+    return Futoshiki(size, clues, counter.futoshiki.bigger_constraint)
+
+
+def puzzle_lines(puzzle) -> list[bytes]:
+    if isinstance(puzzle, BinaryPuzzle):
+        return format_binary_board(puzzle.binary_puzzle_get_board())
+    return format_futoshiki_board(futoshiki_to_board(puzzle))
+
+
+def check_text_size(puzzle_type: str, size: int):
+    # the text format has one character per futoshiki value, found out before generating instead of after
+    if puzzle_type == FUTOSHIKI_PUZZLE and size > len(FUTOSHIKI_SYMBOLS) - 1:
+        raise ValueError(f"The text format holds futoshiki boards up to 9x9, not {size}x{size}")
+
+
+def generate_record(job: tuple[str, int, int, float, float, Optional[int]]) -> bytes:
+    # worker side, one puzzle in the text format
+    return b"\n".join(puzzle_lines(generate_puzzle(*job))) + b"\n"
+
+
+def generate_corpus(puzzle_type: str, size: int, count: int, seed: int = 0, output_file: Optional[str] = None,
+                    directory: Optional[str] = None, clue_density: float = GENERATOR_CLUE_DENSITY,
+                    inequality_density: float = GENERATOR_INEQUALITY_DENSITY, height: Optional[int] = None,
+                    workers: Optional[int] = None) -> int:
+    # puzzle i is generated from seed + i, so a corpus is the same whatever the number of workers;
+    # into one corpus file (records separated by empty lines) and / or one file per puzzle like dane/
+    check_text_size(puzzle_type, size)
+    jobs = [(puzzle_type, size, seed + i, clue_density, inequality_density, height) for i in range(count)]
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    size_name = f"{size}x{size if height is None or puzzle_type == FUTOSHIKI_PUZZLE else height}"
+    output = open(output_file, "wb") if output_file is not None else None
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            for index, record in enumerate(pool.map(generate_record, jobs, chunksize=max(1, count // 64))):
+                if output is not None:
+                    output.write((b"\n" if index > 0 else b"") + record)
+                if directory is not None:
+                    with open(os.path.join(directory, f"{puzzle_type}_{size_name}_{seed + index}"), "wb") as file:
+                        file.write(record)
+    finally:
+        if output is not None:
+            output.close()
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate puzzles with a unique solution in the text format")
+    parser.add_argument("type", choices=[BINARY_PUZZLE, FUTOSHIKI_PUZZLE])
+    parser.add_argument("size", type=int, help="board width (and height)")
+    parser.add_argument("-n", "--count", type=int, default=1)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="corpus file, puzzles separated by empty lines")
+    parser.add_argument("-d", "--directory", help="one file per puzzle")
+    parser.add_argument("--height", type=int, default=None, help="board height of binary puzzles")
+    parser.add_argument("--density", type=float, default=GENERATOR_CLUE_DENSITY,
+                        help="clues left at least, as a share of the cells")
+    parser.add_argument("--inequality-density", type=float, default=GENERATOR_INEQUALITY_DENSITY,
+                        help="share of the futoshiki inequalities kept")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.output is None and args.directory is None:
+        check_text_size(args.type, args.size)
+        print(generate_record((args.type, args.size, args.seed, args.density, args.inequality_density,
+                               args.height)).decode())
+        exit()
+    timer = time.time()
+    generated = generate_corpus(args.type, args.size, args.count, args.seed, args.output, args.directory,
+                                args.density, args.inequality_density, args.height, args.workers)
+    print(f"Generated {generated} puzzles in {time.time() - timer:.2f}s")
@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from binary_lines import LINES_METHOD, BinaryLineSolver
+from binary_puzzle import BinaryPuzzle
+from corpus import BINARY_PUZZLE, FUTOSHIKI_PUZZLE, iter_puzzles
+from csp import CSP_Answer, SEQUENTIAL_HEURISTIC, FORWARD_METHOD
+from futoshiki_dlx import DLX_METHOD, FutoshikiDLX
+from futoshiki_puzzle import Futoshiki, FutoshikiConstraint
+
+SOLUTION_CACHE_CAPACITY = 4096
+CACHE_FILE_EXTENSION = ".json"
+
+# board symmetries as (transpose, mirror x, mirror y): the mirrors are applied after the transposition,
+# the 8 combinations are the rotations and reflections of a square (a rectangle turns into its transposition)
+BOARD_SYMMETRIES = [(t, mx, my) for t in (False, True) for mx in (False, True) for my in (False, True)]
+
+
+class PuzzleDescription:
+    # what a puzzle is made of, independent of the solver: size, clues (x, y, value), inequalities (smaller, bigger)
+    def __init__(self, puzzle_type: str, size_x: int, size_y: int, clues: list[tuple], constraints: list[tuple]):
+        self.puzzle_type = puzzle_type
+        self.size_x = size_x
+        self.size_y = size_y
+        self.clues = clues
+        self.constraints = constraints
+
+    @staticmethod
+    def of(puzzle) -> "PuzzleDescription":
+        if isinstance(puzzle, BinaryPuzzle):
+            return PuzzleDescription(BINARY_PUZZLE, puzzle.size_x, puzzle.size_y,
+                                     [(*a.variable_position, a.answer_domain) for a in puzzle.loaded_data], [])
+        return PuzzleDescription(FUTOSHIKI_PUZZLE, puzzle.n, puzzle.n,
+                                 [(*a.variable_position, a.answer_domain) for a in puzzle.loaded_numbers],
+                                 [(c.smaller_pos, c.bigger_pos) for c in puzzle.bigger_constraint])
+
+    def max_value(self) -> int:
+        return 1 if self.puzzle_type == BINARY_PUZZLE else self.size_x - 1
+
+
+class PuzzleSymmetry:
+    # one element of the puzzle's symmetry group: a board symmetry, optionally with the values swapped
+    # (0 <-> 1 for binary puzzles, v <-> n-1-v for futoshiki, which also turns every inequality around)
+    def __init__(self, description: PuzzleDescription, board: tuple[bool, bool, bool], swap_values: bool):
+        self.transpose, self.mirror_x, self.mirror_y = board
+        self.swap_values = swap_values
+        self.max_value = description.max_value()
+        self.size_x, self.size_y = description.size_x, description.size_y
+        if self.transpose:
+            self.size_x, self.size_y = self.size_y, self.size_x
+
+    def position(self, position: tuple) -> tuple:
+        x, y = position
+        if self.transpose:
+            x, y = y, x
+        if self.mirror_x:
+            x = self.size_x - 1 - x
+        if self.mirror_y:
+            y = self.size_y - 1 - y
+        return x, y
+
+    def inverse_position(self, position: tuple) -> tuple:
+        x, y = position
+        if self.mirror_x:
+            x = self.size_x - 1 - x
+        if self.mirror_y:
+            y = self.size_y - 1 - y
+        return (y, x) if self.transpose else (x, y)
+
+    def value(self, value: int) -> int:
+        # an involution, so it is its own inverse
+        return self.max_value - value if self.swap_values else value
+
+    def canonical_candidate(self, description: PuzzleDescription) -> tuple:
+        clues = sorted((*self.position((x, y)), self.value(v)) for x, y, v in description.clues)
+        constraints = list()
+        for smaller, bigger in description.constraints:
+            smaller, bigger = self.position(smaller), self.position(bigger)
+            constraints.append((bigger, smaller) if self.swap_values else (smaller, bigger))
+        return description.puzzle_type, self.size_x, self.size_y, tuple(clues), tuple(sorted(constraints))
+
+    def to_canonical(self, solution: list[CSP_Answer]) -> list[list[int]]:
+        return sorted([*self.position(a.variable_position), self.value(a.answer_domain)] for a in solution)
+
+    def from_canonical(self, solution: list[list[int]]) -> list[CSP_Answer]:
+        return [CSP_Answer(self.inverse_position((x, y)), self.value(v)) for x, y, v in solution]
+
+
+def canonical_form(puzzle) -> tuple[str, PuzzleSymmetry]:
+    # the smallest image of the puzzle under its symmetry group, hashed, and the symmetry that maps onto it;
+    # every rotated, mirrored or value swapped version of a puzzle gets the same key
+    description = PuzzleDescription.of(puzzle)
+    best = None
+    for board in BOARD_SYMMETRIES:
+        for swap_values in (False, True):
+            symmetry = PuzzleSymmetry(description, board, swap_values)
+            candidate = symmetry.canonical_candidate(description)
+            if best is None or candidate < best[0]:
+                best = (candidate, symmetry)
+    return hashlib.sha256(repr(best[0]).encode()).hexdigest(), best[1]
+
+
+def search_first_solution(puzzle, method: str, heuristic: str, domain_heuristic: str,
+                          number_of_enters: dict) -> list[list[CSP_Answer]]:
+    if method == LINES_METHOD:
+        return list(BinaryLineSolver(puzzle).iter_solutions(1, heuristic, domain_heuristic, number_of_enters))
+    if method == DLX_METHOD:
+        return list(FutoshikiDLX(puzzle).iter_solutions(1, heuristic, domain_heuristic, number_of_enters))
+    start = puzzle.loaded_data if isinstance(puzzle, BinaryPuzzle) else puzzle.loaded_numbers
+    return list(puzzle.solver.iter_solutions(start, 1, method, heuristic, domain_heuristic, number_of_enters))
+
+
+class SolutionCache:
+    # first solutions of puzzles by canonical form, in a bounded LRU in memory and optionally in a directory
+    # of json files (one per puzzle, shared by every process using the same directory).
+    # An unsolvable puzzle is cached as well, with no solutions.
+    def __init__(self, capacity: int = SOLUTION_CACHE_CAPACITY, directory: Optional[str] = None):
+        self.capacity = capacity
+        self.directory = directory
+        self.entries: OrderedDict[str, list[list[list[int]]]] = OrderedDict()  # key -> canonical solutions
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def entry_file(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_FILE_EXTENSION)
+
+    def remember(self, key: str, solutions: list[list[list[int]]]):
+        if self.capacity <= 0:
+            return
+        self.entries[key] = solutions
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+
+    def find(self, key: str) -> Optional[list[list[list[int]]]]:
+        solutions = self.entries.get(key)
+        if solutions is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return solutions
+        if self.directory is not None:
+            try:
+                with open(self.entry_file(key), "r", encoding="utf-8") as file:
+                    solutions = json.load(file)["solutions"]
+            except (OSError, ValueError, KeyError):
+                solutions = None
+            if solutions is not None:
+                self.remember(key, solutions)
+                self.disk_hits += 1
+                return solutions
+        self.misses += 1
+        return None
+
+    def store(self, key: str, solutions: list[list[list[int]]]):
+        self.remember(key, solutions)
+        if self.directory is not None:
+            # written aside and renamed, a reader never sees half a file
+            handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump({"solutions": solutions}, file)
+            os.replace(temporary, self.entry_file(key))
+
+    def lookup(self, puzzle) -> Optional[list[list[CSP_Answer]]]:
+        key, symmetry = canonical_form(puzzle)
+        solutions = self.find(key)
+        if solutions is None:
+            return None
+        return [symmetry.from_canonical(s) for s in solutions]
+
+    def solutions(self, puzzle, method: str = FORWARD_METHOD, heuristic: str = SEQUENTIAL_HEURISTIC,
+                  domain_heuristic: str = SEQUENTIAL_HEURISTIC,
+                  number_of_enters: Optional[dict] = None) -> list[list[CSP_Answer]]:
+        # the first solution (or none), searched for only when no symmetric version of the puzzle is cached
+        key, symmetry = canonical_form(puzzle)
+        solutions = self.find(key)
+        if solutions is None:
+            if number_of_enters is None:
+                number_of_enters = {"number": 0}
+            found = search_first_solution(puzzle, method, heuristic, domain_heuristic, number_of_enters)
+            solutions = [symmetry.to_canonical(s) for s in found]
+            self.store(key, solutions)
+        return [symmetry.from_canonical(s) for s in solutions]
+
+    def try_solve(self, puzzle, method: str = FORWARD_METHOD, heuristic: str = SEQUENTIAL_HEURISTIC,
+                  domain_heuristic: str = SEQUENTIAL_HEURISTIC):
+        number_of_enters = {"number": 0}
+        hits = self.hits + self.disk_hits
+        timer = time.time()
+        total_solutions = self.solutions(puzzle, method, heuristic, domain_heuristic, number_of_enters)
+        end = time.time()
+        if len(total_solutions) > 0:
+            print("Found one solution!")
+        source = "cache hit" if self.hits + self.disk_hits > hits else "searched"
+        print(f"Cached {method} ({source}): Total nodes entered: {number_of_enters['number']}. Took {end - timer}")
+        return total_solutions, (number_of_enters['number'], end - timer)
+
+
+def solve_cached(file_name, cache: SolutionCache, method=FORWARD_METHOD, heuristic=SEQUENTIAL_HEURISTIC,
+                 domain_heuristic=SEQUENTIAL_HEURISTIC) -> tuple[int, float]:
+    print(f"Trying cached {method} with Heuristic: {heuristic.lower()} and domain {domain_heuristic}")
+    puzzle = next(iter_puzzles(file_name))
+    sol, tup = cache.try_solve(puzzle, method, heuristic, domain_heuristic)
+    print(f"FOUND {len(sol)} SOLUTIONS FOR {file_name}")
+    assert all(puzzle.is_solution(e) for e in sol)
+    return tup
+
+
+def transformed_puzzle(puzzle, board: tuple[bool, bool, bool], swap_values: bool):
+    # the puzzle seen through one of its symmetries, a different but equally hard puzzle
+    description = PuzzleDescription.of(puzzle)
+    symmetry = PuzzleSymmetry(description, board, swap_values)
+    clues = [CSP_Answer(symmetry.position((x, y)), symmetry.value(v)) for x, y, v in description.clues]
+    if description.puzzle_type == BINARY_PUZZLE:
+        return BinaryPuzzle(symmetry.size_x, symmetry.size_y, clues)
+    constraints = list()
+    for smaller, bigger in description.constraints:
+        smaller, bigger = symmetry.position(smaller), symmetry.position(bigger)
+        if swap_values:
+            smaller, bigger = bigger, smaller
+        constraints.append(FutoshikiConstraint(smaller, bigger))
+    return Futoshiki(description.size_x, clues, constraints)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Solve puzzles through the solution cache, every symmetric "
+                                                 "version of a puzzle is answered from the cache")
+    parser.add_argument("inputs", nargs="+", help="puzzle files")
+    parser.add_argument("-d", "--directory", help="persistent cache directory")
+    parser.add_argument("--capacity", type=int, default=SOLUTION_CACHE_CAPACITY)
+    parser.add_argument("--method", default=FORWARD_METHOD)
+    parser.add_argument("--heuristic", default=SEQUENTIAL_HEURISTIC)
+    parser.add_argument("--domain-heuristic", default=SEQUENTIAL_HEURISTIC)
+    args = parser.parse_args()
+
+    solution_cache = SolutionCache(args.capacity, args.directory)
+    for input_file in args.inputs:
+        solve_cached(input_file, solution_cache, args.method, args.heuristic, args.domain_heuristic)
+    print(f"Cache: {solution_cache.hits} hits, {solution_cache.disk_hits} disk hits, {solution_cache.misses} misses")
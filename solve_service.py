@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from batch import SOLVERS, JobTimeout, raise_timeout
+from binary_lines import line_pattern_table
+from binary_puzzle import BinaryPuzzle
+from corpus import BUILDERS, parse_record
+from csp import SEQUENTIAL_HEURISTIC, FORWARD_METHOD
+from solution_cache import SOLUTION_CACHE_CAPACITY, SolutionCache
+
+SOLVED_STATUS = "SOLVED"
+UNSOLVED_STATUS = "UNSOLVED"
+TIMEOUT_STATUS = "TIMEOUT"
+ERROR_STATUS = "ERROR"
+
+SERVICE_QUEUE_SIZE = 64  # requests waiting for a worker, a full queue stops reading from the clients
+SERVICE_BATCH_SIZE = 4  # queued requests handed to a worker at once
+SERVICE_MAX_DEADLINE = 24 * 60 * 60.0  # seconds, anything longer is a malformed request (and overflows the timer)
+WARM_LINE_SIZES = range(4, 17, 2)  # binary line pattern tables built when a worker starts
+
+# one per worker process, kept between requests
+worker_cache: Optional[SolutionCache] = None
+
+
+def warm_worker(cache_capacity: int, cache_directory: Optional[str]):
+    global worker_cache
+    worker_cache = SolutionCache(cache_capacity, cache_directory)
+    for size in WARM_LINE_SIZES:
+        line_pattern_table(size)
+
+
+def worker_ready() -> int:
+    return os.getpid()
+
+
+def solution_board(puzzle, answers) -> list[list[int]]:
+    # values as written in the text format, futoshiki digits start at 1
+    if isinstance(puzzle, BinaryPuzzle):
+        return puzzle.binary_puzzle_get_board(answers).tolist()
+    return (puzzle.get_futoshiki_board(answers) + 1).tolist()
+
+
+def solve_request(request: dict, deadline: Optional[float]) -> dict:
+    # runs in a worker; deadline is absolute (time.time()), the time spent queued counts against it
+    reply = {"id": request.get("id")}
+    try:
+        lines = [l.strip().encode() for l in request["puzzle"].splitlines() if l.strip()]
+        puzzle_type, board = parse_record(lines)
+        puzzle = BUILDERS[puzzle_type](board)
+    except (KeyError, ValueError, AssertionError, AttributeError, IndexError) as e:
+        reply.update(status=ERROR_STATUS, error=f"Not a puzzle: {e!r}")
+        return reply
+    method = request.get("method", FORWARD_METHOD)
+    heuristic = request.get("heuristic", SEQUENTIAL_HEURISTIC)
+    domain_heuristic = request.get("domain_heuristic", SEQUENTIAL_HEURISTIC)
+    if not all(isinstance(v, str) for v in (method, heuristic, domain_heuristic)):
+        reply.update(status=ERROR_STATUS, error="method, heuristic and domain_heuristic are strings")
+        return reply
+    if (puzzle_type, method) not in SOLVERS:
+        reply.update(status=ERROR_STATUS, error=f"No method {method} for {puzzle_type} puzzles")
+        return reply
+    remaining = None if deadline is None else deadline - time.time()
+    if remaining is not None and remaining <= 0:
+        reply.update(status=TIMEOUT_STATUS, nodes=0, time=0.0)
+        return reply
+
+    number_of_enters = {"number": 0}
+    hits = worker_cache.hits + worker_cache.disk_hits
+    use_timer = remaining is not None and hasattr(signal, "setitimer")
+    if use_timer:
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, remaining)
+    timer = time.time()
+    try:
+        solutions = worker_cache.solutions(puzzle, method, heuristic, domain_heuristic, number_of_enters)
+    except JobTimeout:
+        reply.update(status=TIMEOUT_STATUS, nodes=number_of_enters["number"], time=time.time() - timer)
+        return reply
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    reply.update(status=SOLVED_STATUS if solutions else UNSOLVED_STATUS,
+                 solutions=[solution_board(puzzle, s) for s in solutions], nodes=number_of_enters["number"],
+                 time=time.time() - timer, cached=worker_cache.hits + worker_cache.disk_hits > hits)
+    return reply
+
+
+def solve_batch(jobs: list[tuple[dict, Optional[float]]]) -> list[dict]:
+    # a request that breaks its solver costs its own reply, not the ones batched with it
+    replies = list()
+    for request, deadline in jobs:
+        try:
+            replies.append(solve_request(request, deadline))
+        except Exception as e:
+            replies.append({"id": request.get("id"), "status": ERROR_STATUS, "error": repr(e)})
+    return replies
+
+
+class SolveService:
+    # Long running solver behind a socket, one JSON request per line in, one JSON reply per line out.
+    # A request: {"id": any, "puzzle": text in the dane/ format, "method", "heuristic", "domain_heuristic",
+    # "deadline": seconds}, replies carry the same id and may come out of order.
+    # Workers are started once and keep their solution cache and pattern tables between requests.
+    def __init__(self, workers: Optional[int] = None, queue_size: int = SERVICE_QUEUE_SIZE,
+                 batch_size: int = SERVICE_BATCH_SIZE, cache_capacity: int = SOLUTION_CACHE_CAPACITY,
+                 cache_directory: Optional[str] = None):
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.pool = ProcessPoolExecutor(self.workers, initializer=warm_worker,
+                                        initargs=(cache_capacity, cache_directory))
+        self.queue: Optional[asyncio.Queue] = None
+        self.served = 0
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.queue_size)
+        # every worker is started (and warmed) now instead of on the first requests
+        await asyncio.gather(*(loop.run_in_executor(self.pool, worker_ready) for _ in range(self.workers)))
+        for _ in range(self.workers):
+            loop.create_task(self.dispatch())
+
+    async def dispatch(self):
+        # one per worker: takes what is queued, up to a batch, and waits for the worker to solve it
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self.queue.get()]
+            while len(jobs) < self.batch_size and not self.queue.empty():
+                jobs.append(self.queue.get_nowait())
+            try:
+                replies = await loop.run_in_executor(self.pool, solve_batch, [(r, d) for r, d, _ in jobs])
+            except Exception as e:
+                replies = [{"id": r.get("id"), "status": ERROR_STATUS, "error": repr(e)} for r, _, _ in jobs]
+            for (_, _, future), reply in zip(jobs, replies):
+                if not future.done():
+                    future.set_result(reply)
+
+    async def enqueue(self, request: dict) -> asyncio.Future:
+        # waits while the queue is full, but not past the request's deadline
+        future = asyncio.get_running_loop().create_future()
+        deadline = None
+        if request.get("deadline") is not None:
+            seconds = float(request["deadline"])
+            if not 0 <= seconds <= SERVICE_MAX_DEADLINE:
+                raise ValueError(f"a deadline is between 0 and {SERVICE_MAX_DEADLINE} seconds, not {seconds}")
+            deadline = time.time() + seconds
+        try:
+            await asyncio.wait_for(self.queue.put((request, deadline, future)),
+                                   None if deadline is None else max(0.0, deadline - time.time()))
+        except asyncio.TimeoutError:
+            future.set_result({"id": request.get("id"), "status": TIMEOUT_STATUS, "nodes": 0, "time": 0.0})
+        return future
+
+    async def reply(self, future: asyncio.Future, writer: asyncio.StreamWriter, lock: asyncio.Lock):
+        reply = await future
+        async with lock:
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+        self.served += 1
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        lock = asyncio.Lock()
+        replies = list()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("a request is a JSON object")
+                    future = await self.enqueue(request)
+                except (TypeError, ValueError) as e:
+                    # not JSON, or a field of the wrong type (a deadline that is no number or out of range)
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_result({"id": request.get("id") if isinstance(request, dict) else None,
+                                       "status": ERROR_STATUS, "error": f"Bad request: {e}"})
+                replies.append(asyncio.create_task(self.reply(future, writer, lock)))
+                replies = [r for r in replies if not r.done()]
+            await asyncio.gather(*replies)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: Optional[str] = None, port: Optional[int] = None, path: Optional[str] = None):
+        await self.start()
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def send_requests(requests: list[dict], host: Optional[str] = None, port: Optional[int] = None,
+                        path: Optional[str] = None) -> list[dict]:
+    # replies in the order of the requests
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    replies = dict()
+    while len(replies) < len(requests):
+        line = await reader.readline()
+        if not line:
+            break
+        reply = json.loads(line)
+        replies[reply.get("id")] = reply
+    writer.close()
+    return [replies.get(r.get("id")) for r in requests]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Solve service over a Unix or TCP socket, JSON lines protocol")
+    parser.add_argument("--unix", help="socket path (instead of TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the service")
+    serve_parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPUs)")
+    serve_parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE)
+    serve_parser.add_argument("--batch-size", type=int, default=SERVICE_BATCH_SIZE)
+    serve_parser.add_argument("--cache-capacity", type=int, default=SOLUTION_CACHE_CAPACITY)
+    serve_parser.add_argument("--cache-directory", help="persistent solution cache shared by the workers")
+    send_parser = commands.add_parser("send", help="send puzzle files to a running service")
+    send_parser.add_argument("inputs", nargs="+", help="puzzle files")
+    send_parser.add_argument("--method", default=FORWARD_METHOD)
+    send_parser.add_argument("--heuristic", default=SEQUENTIAL_HEURISTIC)
+    send_parser.add_argument("--domain-heuristic", default=SEQUENTIAL_HEURISTIC)
+    send_parser.add_argument("-d", "--deadline", type=float, default=None, help="seconds per request")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        service = SolveService(args.workers, args.queue_size, args.batch_size, args.cache_capacity,
+                               args.cache_directory)
+        print(f"Serving on {args.unix or f'{args.host}:{args.port}'} with {service.workers} workers",
+              file=sys.stderr)
+        try:
+            asyncio.run(service.serve(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.close()
+    else:
+        puzzle_requests = list()
+        for index, input_file in enumerate(args.inputs):
+            with open(input_file, "r", encoding="utf-8") as puzzle_file:
+                puzzle_requests.append({"id": index, "puzzle": puzzle_file.read(), "method": args.method,
+                                        "heuristic": args.heuristic, "domain_heuristic": args.domain_heuristic,
+                                        "deadline": args.deadline})
+        for input_file, answer in zip(args.inputs, asyncio.run(send_requests(puzzle_requests, args.host,
+                                                                             args.port, args.unix))):
+            print(f"{input_file}: {json.dumps(answer)}")
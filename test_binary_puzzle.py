@@ -0,0 +1,45 @@
+import pytest
+
+from binary_lines import BinaryLineSolver
+from binary_puzzle import BinaryPuzzle, load_binary_puzzle
+from csp import CSP_Answer, SEQUENTIAL_HEURISTIC, MRV_HEURISTIC, BACKTRACKING_METHOD, FORWARD_METHOD, MAC_METHOD, \
+    BACKJUMPING_METHOD
+
+METHODS = [BACKTRACKING_METHOD, FORWARD_METHOD, MAC_METHOD, BACKJUMPING_METHOD]
+HEURISTICS = [SEQUENTIAL_HEURISTIC, MRV_HEURISTIC]
+
+
+def line_clues(line: str, numbers: list[int], columns: bool = False) -> list[CSP_Answer]:
+    # the same full line as the rows (or columns) numbers, every other cell empty
+    return [CSP_Answer((n, i) if columns else (i, n), int(c)) for n in numbers for i, c in enumerate(line)]
+
+
+@pytest.mark.parametrize("columns", [False, True])
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("heuristic", HEURISTICS)
+def test_duplicate_clue_lines_have_no_solution(columns, method, heuristic):
+    puzzle = BinaryPuzzle(6, 6, line_clues("110100", [0, 3], columns))
+    assert list(puzzle.solver.iter_solutions(puzzle.loaded_data, None, method, heuristic)) == []
+
+
+@pytest.mark.parametrize("columns", [False, True])
+def test_duplicate_clue_lines_have_no_line_pattern_solution(columns):
+    puzzle = BinaryPuzzle(6, 6, line_clues("110100", [0, 3], columns))
+    assert BinaryLineSolver(puzzle).count_solutions() == 0
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("heuristic", HEURISTICS)
+def test_distinct_clue_lines_are_solved(method, heuristic):
+    puzzle = BinaryPuzzle(6, 6, line_clues("110100", [0]) + line_clues("001011", [3]))
+    solutions = list(puzzle.solver.iter_solutions(puzzle.loaded_data, None, method, heuristic))
+    assert len(solutions) == BinaryLineSolver(puzzle).count_solutions() > 0
+    assert all(puzzle.is_solution(s) for s in solutions)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_dane_puzzles_have_valid_solutions(method):
+    for size in [6, 8]:
+        puzzle = load_binary_puzzle(f"dane/binary_{size}x{size}")
+        solutions = list(puzzle.solver.iter_solutions(puzzle.loaded_data, None, method, MRV_HEURISTIC))
+        assert len(solutions) == 1 and puzzle.is_solution(solutions[0])
@@ -3,9 +3,20 @@ from csp import CSP_Answer
 null_answer = CSP_Answer((-1, -1), -1)
 
 
-def get_answer_in_pos(x, y, answers):
-    p = (x, y)
-    for e in answers:
-        if e.variable_position == p:
-            return e
-    return null_answer
+def generate_line_neighbours(positions: list) -> dict:
+    # position -> other positions in the same row or column
+    rows = dict()
+    columns = dict()
+    for p in positions:
+        rows.setdefault(p[1], list()).append(p)
+        columns.setdefault(p[0], list()).append(p)
+    return {p: [o for o in rows[p[1]] + columns[p[0]] if o != p] for p in positions}
+
+
+def bit_indices(mask: int) -> list[int]:
+    indices = list()
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices